@@ -0,0 +1,939 @@
+# Copyright 2025 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+r"""Library to consume the JWT authentication configuration of the `jwt` interface.
+
+The JWT integrator publishes the configuration for JWT authentication in the application
+databag of each `jwt` relation, with the `signing-key` and `issuers` stored in a Juju secret.
+
+The configuration is serialized in a canonical, versioned wire format: the fields are typed
+by a fixed schema, every value is encoded as a string (integers in decimal, including `0`),
+and the `schema-version` field identifies the format. `JwtConfiguration.from_dict()` decodes
+the payload without guessing, and `payload_digest()` returns a digest of the payload that is
+stable across revisions of the provider and the requirer.
+
+Every field is declared once in `PAYLOAD_SCHEMA`, from which the library compiles the encoder
+and decoder of the wire format, and the validator of the provider options, `validate_options()`.
+
+Besides the configuration itself, every publish carries change metadata:
+
+- `generation`: a monotonically increasing counter, bumped on every publish that changed
+  at least one field of the configuration.
+- `changed-fields`: the list of configuration fields that changed with this generation.
+
+Requirers can use this metadata to pick the cheapest way of applying an update, e.g. only
+hot-reloading the security configuration when the signing key was rotated.
+
+`roles-key` and `subject-key` are claim paths: a top-level claim name (`roles`), a dotted path
+(`realm_access.roles`) or a JSON Pointer (`/realm_access/roles`). Providers publish them as
+configured and, for paths not in canonical form, the JSON Pointer they normalize to in
+`roles-path` and `subject-path`. `JwtConfiguration.roles()` and `JwtConfiguration.subject()`
+extract the claims through accessors compiled once per path, from the normalized path if any.
+
+The optional `role-mapping` field maps the roles of a token to the roles of the backend, as a
+decision table compiled by the provider: every token role resolves to the backend roles of its
+exact rule, else of its longest prefix rule, else of the default rule. `RoleMapping` evaluates
+the table with a hash lookup per distinct prefix length.
+
+Revoked tokens are published by their `jti` claim, grouped by the expiry of the token in
+buckets of `REVOCATION_BUCKET_SECONDS`, each in a field of its own named after the start of the
+bucket (`revoked-<unix time>`). A bucket holds a Bloom filter of most of its tokens and the exact
+list of the tokens revoked since the filter was last rebuilt, and is dropped by the provider
+once all its tokens expired. `JwtConfiguration.is_revoked()` checks a token in the bucket of its
+`exp` claim with at most `k` bit lookups, without any network call. The filters are sized for a
+false positive rate of `BLOOM_FALSE_POSITIVE_RATE`.
+
+A provider trusting several issuers publishes them in the optional `issuers` field, mapping
+each issuer (the `iss` claim) to its `signing-key`, and their audiences in the optional
+`issuer-audiences` field, mapping each issuer to its `required-audience`. Keys are rotated
+with a hot reload, while a change of audience requires a restart, as the top-level
+`required-audience` does. Verifiers select the key set of a token with
+`JwtConfiguration.select_key_set()`, a single lookup by the unverified `iss` claim, instead of
+trying every key. The signature must still be verified
+with the selected key set before trusting any claim of the token.
+
+The optional `key-cache-ttl`, `verified-token-cache-size` and `negative-cache-ttl` fields tune
+the caches of the verifiers, exposed with defaults as `JwtConfiguration.cache_hints`. Verified
+tokens must still be checked with `is_revoked()` when served from the cache, as revocations
+apply as soon as they are published.
+
+```python
+
+from charms.jwt_integrator.v0.jwt_configuration import (
+    JwtConfiguration,
+    JwtConfigurationRequirerData,
+    ReloadPath,
+)
+
+class ApplicationCharm(CharmBase):
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.jwt = JwtConfigurationRequirerData(self.model, "jwt-configuration")
+        self.framework.observe(
+            self.on["jwt-configuration"].relation_changed, self._on_jwt_changed
+        )
+
+    def _on_jwt_changed(self, event: RelationChangedEvent) -> None:
+        if not (change := self.jwt.fetch_change(event.relation.id)):
+            return
+
+        match change.reload_path:
+            case ReloadPath.HOT_RELOAD:
+                self.workload.reload_security_config()
+            case ReloadPath.RESTART:
+                self.workload.restart()
+
+        configuration = self.jwt.fetch_configuration(event.relation.id)
+
+    def verify(self, token: str, configuration: JwtConfiguration) -> dict:
+        if not (key_set := configuration.select_key_set(token)):
+            raise InvalidTokenError("Untrusted issuer")
+
+        return jwt.decode(
+            token, key_set.signing_key, audience=key_set.required_audience, issuer=key_set.issuer
+        )
+```
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import math
+from dataclasses import dataclass
+from enum import Enum
+from functools import cached_property, lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from charms.data_platform_libs.v0.data_interfaces import RequirerData
+from ops import Model
+
+# The unique Charmhub library identifier, never change it
+LIBID = "dd91f25191b1489dab092d29c0341356"
+
+# Increment this major API version when introducing breaking changes
+LIBAPI = 0
+
+# Increment this PATCH version before using `charmcraft publish-lib` or reset
+# to 0 if you are raising the major API version
+LIBPATCH = 13
+
+PYDEPS = ["ops>=2.0.0"]
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+SCHEMA_VERSION_FIELD = "schema-version"
+
+# Upper bounds of the caching hints
+MAX_CACHE_TTL = 86400
+MAX_VERIFIED_TOKEN_CACHE_SIZE = 1_000_000
+
+
+class FieldSpec(NamedTuple):
+    """The declaration of a configuration field, from which its handling is compiled.
+
+    Attributes:
+        field: the name of the field in the payload, and of the option setting it.
+        attribute: the name of the attribute of `JwtConfiguration`.
+        type: the type of the decoded value.
+        option: whether the field is set as is from the provider option of the same name,
+            else it is derived by the provider (e.g. from the signing key secret).
+        required: whether the field must be set.
+        minimum: the lower bound of an integer field.
+        maximum: the upper bound of an integer field.
+        normalize: the canonical form of a string field, raising `ValueError` or
+            `JwtConfigurationError` if the value is invalid.
+        source: the option a derived field is the canonical form of, by `normalize`. The
+            field is only set when the option differs from its canonical form.
+        secret: whether the field is published in the Juju secret.
+        hot_reloadable: whether services can apply a change of the field without a restart.
+    """
+
+    field: str
+    attribute: str
+    type: type
+    option: bool = True
+    required: bool = False
+    minimum: Optional[int] = None
+    maximum: Optional[int] = None
+    normalize: Optional[Callable[[str], str]] = None
+    source: Optional[str] = None
+    secret: bool = False
+    hot_reloadable: bool = False
+
+
+# Canonical order and declaration of the configuration fields
+PAYLOAD_SCHEMA = (
+    FieldSpec(
+        "signing-key",
+        "signing_key",
+        str,
+        option=False,
+        required=True,
+        secret=True,
+        hot_reloadable=True,
+    ),
+    # claim paths are published as configured, once validated by `check_claim_path` defined
+    # below, and normalized to JSON Pointers in the `-path` fields
+    FieldSpec(
+        "roles-key",
+        "roles_key",
+        str,
+        required=True,
+        normalize=lambda path: check_claim_path(path),
+    ),
+    FieldSpec("jwt-header", "jwt_header", str),
+    FieldSpec("jwt-url-parameter", "jwt_url_parameter", str),
+    FieldSpec("subject-key", "subject_key", str, normalize=lambda path: check_claim_path(path)),
+    FieldSpec(
+        "roles-path",
+        "roles_path",
+        str,
+        option=False,
+        normalize=lambda path: normalize_claim_path(path),
+        source="roles-key",
+    ),
+    FieldSpec(
+        "subject-path",
+        "subject_path",
+        str,
+        option=False,
+        normalize=lambda path: normalize_claim_path(path),
+        source="subject-key",
+    ),
+    FieldSpec("required-audience", "required_audience", str),
+    FieldSpec("required-issuer", "required_issuer", str),
+    FieldSpec("jwt-clock-skew-tolerance", "jwt_clock_skew_tolerance", int, minimum=0),
+    # JSON mapping of issuer to its `signing-key`, and of issuer to its `required-audience`
+    FieldSpec("issuers", "issuers", dict, option=False, secret=True, hot_reloadable=True),
+    FieldSpec("issuer-audiences", "issuer_audiences", dict, option=False),
+    # JSON decision table mapping token roles to backend roles, see `RoleMapping`
+    FieldSpec("role-mapping", "role_mapping", dict, option=False),
+    # RFC 7638 thumbprint of the signing key, and JWK set of the public keys of the issuer
+    FieldSpec("key-id", "key_id", str, option=False, hot_reloadable=True),
+    FieldSpec("jwks", "jwks", dict, option=False, hot_reloadable=True),
+    # caching hints for verifiers, see `CacheHints`
+    FieldSpec(
+        "key-cache-ttl",
+        "key_cache_ttl",
+        int,
+        minimum=0,
+        maximum=MAX_CACHE_TTL,
+        hot_reloadable=True,
+    ),
+    FieldSpec(
+        "verified-token-cache-size",
+        "verified_token_cache_size",
+        int,
+        minimum=0,
+        maximum=MAX_VERIFIED_TOKEN_CACHE_SIZE,
+        hot_reloadable=True,
+    ),
+    FieldSpec(
+        "negative-cache-ttl",
+        "negative_cache_ttl",
+        int,
+        minimum=0,
+        maximum=MAX_CACHE_TTL,
+        hot_reloadable=True,
+    ),
+)
+JWT_CONFIGURATION_FIELDS = tuple(spec.field for spec in PAYLOAD_SCHEMA)
+PAYLOAD_FIELDS = (SCHEMA_VERSION_FIELD,) + JWT_CONFIGURATION_FIELDS
+SECRET_FIELDS = [spec.field for spec in PAYLOAD_SCHEMA if spec.secret]
+REQUIRED_FIELDS = tuple(spec.field for spec in PAYLOAD_SCHEMA if spec.required)
+
+GENERATION_FIELD = "generation"
+CHANGED_FIELDS_FIELD = "changed-fields"
+
+# Fields that services can apply without a restart (e.g. the OpenSearch security plugin
+# reloads its signing keys on the fly)
+HOT_RELOADABLE_FIELDS = frozenset(spec.field for spec in PAYLOAD_SCHEMA if spec.hot_reloadable)
+
+# Prefix of the fields holding the buckets of revoked tokens, followed by the start of the bucket
+REVOCATION_FIELD_PREFIX = "revoked-"
+REVOCATION_BUCKET_SECONDS = 3600
+
+# Caching parameters of verifiers when the provider publishes no hint
+DEFAULT_KEY_CACHE_TTL = 300
+DEFAULT_VERIFIED_TOKEN_CACHE_SIZE = 1024
+DEFAULT_NEGATIVE_CACHE_TTL = 30
+
+# False positive rate of the Bloom filter of revoked tokens: the share of valid tokens rejected
+BLOOM_FALSE_POSITIVE_RATE = 1e-6
+
+
+def is_revocation_field(field: str) -> bool:
+    """Whether the field holds a bucket of revoked tokens."""
+    return (
+        field.startswith(REVOCATION_FIELD_PREFIX)
+        and field[len(REVOCATION_FIELD_PREFIX) :].isdigit()
+    )
+
+
+def revocation_bucket(expiry: int) -> int:
+    """Return the start of the bucket of the revoked tokens expiring at the given time."""
+    return expiry - expiry % REVOCATION_BUCKET_SECONDS
+
+
+def payload_fields(payload: Mapping[str, str]) -> Tuple[str, ...]:
+    """Return the payload fields in canonical order, including the buckets of revoked tokens."""
+    return PAYLOAD_FIELDS + tuple(
+        sorted(
+            (field for field in payload if is_revocation_field(field)),
+            key=lambda field: int(field[len(REVOCATION_FIELD_PREFIX) :]),
+        )
+    )
+
+
+class JwtConfigurationError(Exception):
+    """Common ancestor for errors of the JWT configuration library."""
+
+
+class UnsupportedSchemaVersionError(JwtConfigurationError):
+    """The payload was published in a schema version unknown to this library."""
+
+
+class InvalidClaimPathError(JwtConfigurationError):
+    """A claim path is neither a claim name, a dotted path nor a JSON Pointer."""
+
+
+class InvalidRoleMappingError(JwtConfigurationError):
+    """A role mapping rule is invalid."""
+
+
+def parse_claim_path(path: str) -> Tuple[str, ...]:
+    """Split a claim path into the names of the nested claims leading to the claim.
+
+    The path is either a JSON Pointer (`/realm_access/roles`), a claim name holding a `/`
+    such as a namespaced claim (`https://example.com/roles`), or a dotted path
+    (`realm_access.roles`), a plain claim name being a dotted path of a single claim.
+
+    Raises:
+        InvalidClaimPathError: if the path is empty, has an empty segment or an invalid
+            JSON Pointer escape.
+    """
+    if path.startswith("/"):
+        segments = path[1:].split("/")
+        for segment in segments:
+            if "~" in segment.replace("~0", "").replace("~1", ""):
+                raise InvalidClaimPathError(f"Invalid escape in claim path {path!r}")
+        segments = [segment.replace("~1", "/").replace("~0", "~") for segment in segments]
+    elif "/" in path:
+        segments = [path]
+    else:
+        segments = path.split(".")
+
+    if not all(segments):
+        raise InvalidClaimPathError(f"Empty claim name in claim path {path!r}")
+    return tuple(segments)
+
+
+def normalize_claim_path(path: str) -> str:
+    """Return the canonical form of a claim path.
+
+    A path made of a single claim name is its name, as long as the name cannot be read as a
+    path itself, any other path is a JSON Pointer.
+
+    Raises:
+        InvalidClaimPathError: if the path is invalid.
+    """
+    segments = parse_claim_path(path)
+    if len(segments) == 1 and parse_claim_path(segments[0]) == segments:
+        return segments[0]
+    return "".join("/" + segment.replace("~", "~0").replace("/", "~1") for segment in segments)
+
+
+def check_claim_path(path: str) -> str:
+    """Return the claim path as is, once checked to be valid.
+
+    Raises:
+        InvalidClaimPathError: if the path is invalid.
+    """
+    parse_claim_path(path)
+    return path
+
+
+@lru_cache(maxsize=64)
+def claim_accessor(path: str) -> Callable[[Mapping[str, Any]], Any]:
+    """Compile a claim path into a function returning the claim from the claims of a token.
+
+    The function returns None if the claim is missing.
+
+    Raises:
+        InvalidClaimPathError: if the path is invalid.
+    """
+    segments = parse_claim_path(path)
+
+    if len(segments) == 1:
+        (name,) = segments
+        return lambda claims: claims.get(name)
+
+    if len(segments) == 2:
+        outer, inner = segments
+
+        def accessor(claims: Mapping[str, Any]) -> Any:
+            try:
+                return claims[outer][inner]
+            except (KeyError, TypeError):
+                return None
+
+        return accessor
+
+    def accessor(claims: Mapping[str, Any]) -> Any:
+        value: Any = claims
+        try:
+            for segment in segments:
+                value = value[segment]
+        except (KeyError, TypeError):
+            return None
+        return value
+
+    return accessor
+
+
+def compile_role_mapping(rules: Mapping[str, Union[str, List[str]]]) -> Dict[str, Any]:
+    """Compile role mapping rules into the decision table published to requirers.
+
+    Rules map a token role pattern to one or several backend roles. A pattern is either a
+    role (`admin`), a prefix followed by a wildcard (`team-*`), or the wildcard alone (`*`),
+    which applies to the roles matching no other rule.
+
+    Raises:
+        InvalidRoleMappingError: if a pattern or the backend roles of a rule are invalid.
+    """
+    table: Dict[str, Any] = {"exact": {}, "prefix": {}, "default": []}
+    for pattern, backend_roles in rules.items():
+        if isinstance(backend_roles, str):
+            backend_roles = [backend_roles]
+        if (
+            not isinstance(pattern, str)
+            or not isinstance(backend_roles, list)
+            or not all(isinstance(role, str) and role for role in backend_roles)
+        ):
+            raise InvalidRoleMappingError(f"Invalid rule {pattern!r}: {backend_roles!r}")
+
+        backend_roles = sorted(set(backend_roles))
+        if pattern == "*":
+            table["default"] = backend_roles
+        elif not pattern or "*" in pattern[:-1]:
+            raise InvalidRoleMappingError(
+                f"Invalid pattern {pattern!r}, only a trailing wildcard is supported"
+            )
+        elif pattern.endswith("*"):
+            table["prefix"][pattern[:-1]] = backend_roles
+        else:
+            table["exact"][pattern] = backend_roles
+
+    return {section: rules for section, rules in table.items() if rules}
+
+
+class RoleMapping:
+    """Evaluator of a role mapping decision table."""
+
+    def __init__(self, table: Mapping[str, Any]):
+        self._exact = {role: frozenset(roles) for role, roles in table.get("exact", {}).items()}
+        self._default = frozenset(table.get("default", []))
+
+        # prefixes grouped by length, the longest first, for one lookup per distinct length
+        prefixes: Dict[int, Dict[str, FrozenSet[str]]] = {}
+        for prefix, roles in table.get("prefix", {}).items():
+            prefixes.setdefault(len(prefix), {})[prefix] = frozenset(roles)
+        self._prefixes = sorted(prefixes.items(), reverse=True)
+
+    def resolve_role(self, role: str) -> FrozenSet[str]:
+        """Return the backend roles of a token role."""
+        if (roles := self._exact.get(role)) is not None:
+            return roles
+
+        for length, prefixes in self._prefixes:
+            if (roles := prefixes.get(role[:length])) is not None:
+                return roles
+
+        return self._default
+
+    def resolve(self, roles: Union[str, Iterable[str], None]) -> FrozenSet[str]:
+        """Return the backend roles of the roles of a token."""
+        if roles is None:
+            return frozenset()
+        if isinstance(roles, str):
+            roles = [roles]
+        return frozenset().union(*(self.resolve_role(role) for role in roles))
+
+
+class BloomFilter:
+    """Bloom filter of strings, e.g. the ids of revoked tokens.
+
+    The `hashes` bit positions of a member are derived from a single digest by double hashing.
+    The step between the positions is odd: it is never 0, and shares no factor of 2 with the
+    size of the filter (a multiple of 8), so that the positions of a member do not collapse.
+    """
+
+    def __init__(self, size: int, hashes: int, bits: Optional[bytearray] = None):
+        self.size = size
+        self.hashes = hashes
+        self.bits = bits if bits is not None else bytearray(-(-size // 8))
+
+    @classmethod
+    def build(
+        cls, members: Iterable[str], false_positive_rate: float = BLOOM_FALSE_POSITIVE_RATE
+    ) -> "BloomFilter":
+        """Build a filter of the members, sized for the given false positive rate."""
+        members = list(members)
+        count = max(len(members), 1)
+        size = math.ceil(-count * math.log(false_positive_rate) / math.log(2) ** 2)
+        size = -(-size // 8) * 8
+        hashes = max(round(size / count * math.log(2)), 1)
+
+        bloom_filter = cls(size, hashes)
+        for member in members:
+            bloom_filter.add(member)
+        return bloom_filter
+
+    @staticmethod
+    def _digest(member: str) -> Tuple[int, int]:
+        """Return the first bit position of a member and the (odd) step to the next ones."""
+        digest = hashlib.blake2b(member.encode(), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def add(self, member: str) -> None:
+        """Add a member to the filter."""
+        first, second = self._digest(member)
+        for i in range(self.hashes):
+            position = (first + i * second) % self.size
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, member: str) -> bool:
+        """Whether the member may be in the filter, false positives being possible."""
+        first, second = self._digest(member)
+        bits, size = self.bits, self.size
+        for i in range(self.hashes):
+            position = (first + i * second) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the filter in the wire format."""
+        return {
+            "size": self.size,
+            "hashes": self.hashes,
+            "bits": base64.b64encode(self.bits).decode(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "BloomFilter":
+        """Decode the filter from the wire format."""
+        return cls(data["size"], data["hashes"], bytearray(base64.b64decode(data["bits"])))
+
+
+def _encode(value: Any) -> str:
+    """Encode a field value in the wire format."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return str(value)
+
+
+def _compile_check(spec: FieldSpec) -> Callable[[Any], Any]:
+    """Compile the check of the option of a field, returning its value, None if unset."""
+    if spec.type is int:
+        minimum = -math.inf if spec.minimum is None else spec.minimum
+        maximum = math.inf if spec.maximum is None else spec.maximum
+        bounds = f"between {spec.minimum} and {spec.maximum}"
+        if spec.maximum is None:
+            bounds = f"at least {spec.minimum}"
+
+        def check_int(value: Any) -> Optional[int]:
+            if value is None:
+                return None
+            if type(value) is not int:
+                raise TypeError("must be an integer")
+            if not minimum <= value <= maximum:
+                raise ValueError(f"must be {bounds}")
+            return value
+
+        return check_int
+
+    normalize = spec.normalize
+
+    def check_str(value: Any) -> Optional[str]:
+        if value is None or value == "":
+            return None
+        if not isinstance(value, str):
+            raise TypeError("must be a string")
+        return normalize(value) if normalize else value
+
+    return check_str
+
+
+def compile_validator(
+    schema: Iterable[FieldSpec],
+) -> Callable[[Mapping[str, Any]], Tuple[Dict[str, Any], Dict[str, str]]]:
+    """Compile the validator of the provider options setting the fields of a schema.
+
+    The check of each field is resolved once here, so that validating options runs a list of
+    precompiled checks. Presence of the required fields is left to the provider, as some are
+    not set by options.
+
+    Returns:
+        the validator, returning the values of the valid options by attribute, unset options
+        being None, and the reason each invalid option is invalid, by field.
+    """
+    schema = tuple(schema)
+    checks = [(spec.field, spec.attribute, _compile_check(spec)) for spec in schema if spec.option]
+    attributes = {spec.field: spec.attribute for spec in schema}
+    derivations = [
+        (spec.attribute, attributes[spec.source], spec.normalize)
+        for spec in schema
+        if spec.source and spec.normalize
+    ]
+
+    def validate(options: Mapping[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        values, errors = {}, {}
+        for field, attribute, check in checks:
+            try:
+                values[attribute] = check(options.get(field))
+            except (TypeError, ValueError, JwtConfigurationError) as e:
+                errors[field] = str(e)
+        for attribute, source, normalize in derivations:
+            value = values.get(source)
+            derived = normalize(value) if value is not None else None
+            values[attribute] = derived if derived != value else None
+        return values, errors
+
+    return validate
+
+
+def compile_serializer(schema: Iterable[FieldSpec]) -> Callable[[Any], Dict[str, str]]:
+    """Compile the encoder of the fields of a schema to the wire format, in schema order.
+
+    Fields whose attribute is `None` are left out.
+    """
+    encoders = [
+        (spec.field, spec.attribute, _encode if spec.type in (dict, list) else str)
+        for spec in schema
+    ]
+
+    def serialize(configuration: Any) -> Dict[str, str]:
+        data = {SCHEMA_VERSION_FIELD: str(SCHEMA_VERSION)}
+        for field, attribute, encode in encoders:
+            if (value := getattr(configuration, attribute)) is not None:
+                data[field] = encode(value)
+        return data
+
+    return serialize
+
+
+def compile_parser(schema: Iterable[FieldSpec]) -> Callable[[Mapping[str, str]], Dict[str, Any]]:
+    """Compile the decoder of the fields of a schema from the wire format, by attribute."""
+    decoders = [
+        (spec.field, spec.attribute, json.loads if spec.type in (dict, list) else spec.type)
+        for spec in schema
+    ]
+
+    def parse(data: Mapping[str, str]) -> Dict[str, Any]:
+        return {
+            attribute: decode(data[field])
+            for field, attribute, decode in decoders
+            if field in data
+        }
+
+    return parse
+
+
+# Validator of the provider options, and codec of the payload
+validate_options = compile_validator(PAYLOAD_SCHEMA)
+_serialize_payload = compile_serializer(PAYLOAD_SCHEMA)
+_parse_payload = compile_parser(PAYLOAD_SCHEMA)
+
+
+def unverified_issuer(token: str) -> Optional[str]:
+    """Return the `iss` claim of a JWT without verifying its signature, None if malformed.
+
+    Only meant to select the key set to verify the token with: the claim must not be trusted
+    before the signature was verified.
+    """
+    try:
+        _, payload, _ = token.split(".")
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except ValueError:
+        return None
+
+    issuer = claims.get("iss") if isinstance(claims, dict) else None
+    return issuer if isinstance(issuer, str) else None
+
+
+@dataclass(frozen=True)
+class IssuerKeySet:
+    """The key set and audience to verify the tokens of an issuer with."""
+
+    issuer: Optional[str]
+    signing_key: str
+    required_audience: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class CacheHints:
+    """The parameters of the caches of a verifier, as tuned by the provider.
+
+    Attributes:
+        key_ttl: seconds a parsed key set may be used before it is read again.
+        verified_token_cache_size: number of verified tokens whose claims may be cached,
+            until they expire; `0` disables the cache.
+        negative_ttl: seconds a rejected token may be rejected again without verification.
+    """
+
+    key_ttl: int = DEFAULT_KEY_CACHE_TTL
+    verified_token_cache_size: int = DEFAULT_VERIFIED_TOKEN_CACHE_SIZE
+    negative_ttl: int = DEFAULT_NEGATIVE_CACHE_TTL
+
+
+@dataclass
+class JwtConfiguration:
+    """The configuration parameters of JWT authentication."""
+
+    signing_key: str
+    roles_key: str
+    jwt_header: Optional[str] = None
+    jwt_url_parameter: Optional[str] = None
+    subject_key: Optional[str] = None
+    required_audience: Optional[str] = None
+    required_issuer: Optional[str] = None
+    jwt_clock_skew_tolerance: Optional[int] = None
+    issuers: Optional[Dict[str, Dict[str, str]]] = None
+    issuer_audiences: Optional[Dict[str, str]] = None
+    role_mapping: Optional[Dict[str, Any]] = None
+    key_id: Optional[str] = None
+    jwks: Optional[Dict[str, Any]] = None
+    key_cache_ttl: Optional[int] = None
+    verified_token_cache_size: Optional[int] = None
+    negative_cache_ttl: Optional[int] = None
+    # normalized `roles_key` and `subject_key`, when they differ from their canonical form
+    roles_path: Optional[str] = None
+    subject_path: Optional[str] = None
+    # buckets of revoked tokens by start, each with its `filter` and `tokens`
+    revocations: Optional[Dict[int, Dict[str, Any]]] = None
+
+    def to_dict(self) -> Dict[str, str]:
+        """Return the configuration in the canonical wire format.
+
+        Fields are ordered by the schema, and only unset (`None`) fields are left out.
+        """
+        data = _serialize_payload(self)
+        for start, bucket in sorted((self.revocations or {}).items()):
+            data[f"{REVOCATION_FIELD_PREFIX}{start}"] = _encode(bucket)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, str]) -> "JwtConfiguration":
+        """Decode the configuration from the wire format.
+
+        Payloads of providers predating the `schema-version` field are decoded as version 0,
+        which shares the fields of version 1.
+
+        Raises:
+            UnsupportedSchemaVersionError: if the payload uses a newer schema version.
+        """
+        if (version := int(data.get(SCHEMA_VERSION_FIELD, 0))) > SCHEMA_VERSION:
+            raise UnsupportedSchemaVersionError(f"Unsupported schema version {version}")
+
+        revocations = {
+            int(field[len(REVOCATION_FIELD_PREFIX) :]): json.loads(value)
+            for field, value in data.items()
+            if is_revocation_field(field)
+        }
+        return cls(**_parse_payload(data), revocations=revocations or None)
+
+    @property
+    def cache_hints(self) -> CacheHints:
+        """The parameters of the verifier caches, defaulting to the library ones if unset."""
+        defaults = CacheHints()
+        return CacheHints(
+            key_ttl=defaults.key_ttl if self.key_cache_ttl is None else self.key_cache_ttl,
+            verified_token_cache_size=(
+                defaults.verified_token_cache_size
+                if self.verified_token_cache_size is None
+                else self.verified_token_cache_size
+            ),
+            negative_ttl=(
+                defaults.negative_ttl
+                if self.negative_cache_ttl is None
+                else self.negative_cache_ttl
+            ),
+        )
+
+    def roles(self, claims: Mapping[str, Any]) -> Any:
+        """Return the roles claim of a token, found at the `roles-key` path."""
+        return claim_accessor(self.roles_path or self.roles_key)(claims)
+
+    def subject(self, claims: Mapping[str, Any]) -> Any:
+        """Return the subject claim of a token, found at the `subject-key` path, else `sub`."""
+        return claim_accessor(self.subject_path or self.subject_key or "sub")(claims)
+
+    @cached_property
+    def role_mapper(self) -> Optional[RoleMapping]:
+        """The evaluator of the role mapping, None if the provider published none."""
+        return RoleMapping(self.role_mapping) if self.role_mapping is not None else None
+
+    def backend_roles(self, claims: Mapping[str, Any]) -> Optional[FrozenSet[str]]:
+        """Return the backend roles of a token, None if the provider published no role mapping."""
+        if self.role_mapper is None:
+            return None
+        return self.role_mapper.resolve(self.roles(claims))
+
+    @cached_property
+    def _revocations(self) -> Dict[int, Tuple[Optional[BloomFilter], FrozenSet[str]]]:
+        """The decoded filter and exact set of revoked tokens of each bucket."""
+        return {
+            start: (
+                BloomFilter.from_dict(bucket["filter"]) if bucket.get("filter") else None,
+                frozenset(bucket.get("tokens", [])),
+            )
+            for start, bucket in (self.revocations or {}).items()
+        }
+
+    def is_revoked(self, jti: Optional[str], expiry: Optional[int] = None) -> bool:
+        """Whether the token of the given `jti` claim was revoked.
+
+        With the `exp` claim of the token, only the bucket of its expiry is checked.
+        A token may be reported revoked with a probability of `BLOOM_FALSE_POSITIVE_RATE`
+        while it was not.
+        """
+        if jti is None:
+            return False
+
+        if expiry is not None:
+            buckets = [self._revocations.get(revocation_bucket(int(expiry)))]
+        else:
+            buckets = list(self._revocations.values())
+
+        return any(
+            jti in revoked_tokens or (bloom_filter is not None and jti in bloom_filter)
+            for bloom_filter, revoked_tokens in filter(None, buckets)
+        )
+
+    def key_set(self, issuer: Optional[str]) -> Optional[IssuerKeySet]:
+        """Return the key set trusted for an issuer, None if the issuer is not trusted.
+
+        Without `issuers`, the configuration trusts a single issuer: `required-issuer` if set,
+        any issuer otherwise.
+        """
+        if self.issuers is None:
+            if self.required_issuer is not None and issuer != self.required_issuer:
+                return None
+            return IssuerKeySet(self.required_issuer, self.signing_key, self.required_audience)
+
+        if issuer is None or not (entry := self.issuers.get(issuer)):
+            return None
+        # providers before `issuer-audiences` publish the audience in the issuer entry
+        audience = (self.issuer_audiences or {}).get(issuer, entry.get("required-audience"))
+        return IssuerKeySet(issuer, entry["signing-key"], audience)
+
+    def select_key_set(self, token: str) -> Optional[IssuerKeySet]:
+        """Return the key set to verify a token with, selected by its unverified `iss` claim."""
+        return self.key_set(unverified_issuer(token))
+
+
+def payload_digest(payload: Mapping[str, str]) -> str:
+    """Return a digest of the payload fields, independent of any other field in the databag."""
+    canonical = json.dumps(
+        [[field, payload[field]] for field in payload_fields(payload) if field in payload],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ReloadPath(str, Enum):
+    """The cheapest way for a requirer to apply a published change."""
+
+    NONE = "none"
+    HOT_RELOAD = "hot-reload"
+    RESTART = "restart"
+
+
+def reload_path(changed_fields: Iterable[str]) -> ReloadPath:
+    """Return the cheapest reload path that applies the given set of changed fields."""
+    changed_fields = frozenset(changed_fields) - {SCHEMA_VERSION_FIELD}
+    if not changed_fields:
+        return ReloadPath.NONE
+
+    if all(
+        field in HOT_RELOADABLE_FIELDS or is_revocation_field(field) for field in changed_fields
+    ):
+        return ReloadPath.HOT_RELOAD
+
+    return ReloadPath.RESTART
+
+
+@dataclass(frozen=True)
+class PublishedChange:
+    """Change metadata of the latest publish of the provider."""
+
+    generation: int
+    changed_fields: FrozenSet[str]
+
+    @property
+    def reload_path(self) -> ReloadPath:
+        """Return the cheapest reload path for this change."""
+        return reload_path(self.changed_fields)
+
+
+class JwtConfigurationRequirerData(RequirerData):
+    """Requirer-side of the `jwt` interface."""
+
+    def __init__(self, model: Model, relation_name: str) -> None:
+        super().__init__(model, relation_name, additional_secret_fields=SECRET_FIELDS)
+
+    def fetch_change(self, relation_id: int) -> Optional[PublishedChange]:
+        """Return the change metadata of the latest publish, if the provider published any.
+
+        Only the databag is read, the secret holding the `signing-key` is not accessed.
+        """
+        data = self.fetch_relation_data(
+            [relation_id], [GENERATION_FIELD, CHANGED_FIELDS_FIELD]
+        ).get(relation_id, {})
+
+        if not (generation := data.get(GENERATION_FIELD)):
+            return None
+
+        try:
+            changed_fields = frozenset(json.loads(data.get(CHANGED_FIELDS_FIELD, "[]")))
+        except json.JSONDecodeError:
+            logger.error("Invalid %s in relation %s", CHANGED_FIELDS_FIELD, relation_id)
+            changed_fields = frozenset(JWT_CONFIGURATION_FIELDS)
+
+        return PublishedChange(generation=int(generation), changed_fields=changed_fields)
+
+    def fetch_configuration(self, relation_id: int) -> Optional[JwtConfiguration]:
+        """Return the configuration published to the relation, if the provider published any."""
+        data = self.fetch_relation_data([relation_id]).get(relation_id, {})
+
+        if not data.get("signing-key"):
+            return None
+
+        return JwtConfiguration.from_dict(data)
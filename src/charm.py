@@ -10,8 +10,13 @@ import ops
 from data_platform_helpers.advanced_statuses.handler import StatusHandler
 
 from core.state import State
+from events.action_handler import ActionEvents
 from events.basic_handler import BasicEvents
+from events.journal import EventJournal
 from managers.jwt_config import JwtConfigManager
+from managers.revocation import RevocationManager
+from managers.signing_key import SigningKeyManager
+from managers.token_minter import TokenMinter
 
 logger = logging.getLogger(__name__)
 
@@ -23,8 +28,15 @@ class JwtIntegratorCharm(ops.CharmBase):
         super().__init__(framework)
         self.state = State(self)
 
+        # --- EVENT JOURNAL --- (observes events before the status and event handlers)
+        if journal_path := self.config.get("event-journal"):
+            self.event_journal = EventJournal(self, str(journal_path))
+
         # --- MANAGERS ---
         self.jwt_config_manager = JwtConfigManager(state=self.state)
+        self.revocation_manager = RevocationManager(state=self.state)
+        self.signing_key_manager = SigningKeyManager(state=self.state)
+        self.token_minter = TokenMinter(state=self.state)
 
         # --- STATUS HANDLER ---
         self.status = StatusHandler(  # priority order
@@ -34,6 +46,7 @@ class JwtIntegratorCharm(ops.CharmBase):
 
         # --- EVENT HANDLERS ---
         self.basic_events = BasicEvents(self)
+        self.action_events = ActionEvents(self)
 
 
 if __name__ == "__main__":  # pragma: nocover
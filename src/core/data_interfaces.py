@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Extensions of the data_interfaces library for the relations of the charm.
+
+The library is vendored from data_platform_libs and kept as published: the behaviours the
+charm needs on top of it, at high relation counts, are implemented here by subclassing.
+"""
+
+import logging
+import threading
+from collections.abc import Iterable
+from typing import Optional, Union
+from weakref import WeakKeyDictionary
+
+from charms.data_platform_libs.v0.data_interfaces import (
+    SECRET_GROUPS,
+    CachedSecret,
+    Data,
+    SecretAlreadyExistsError,
+    SecretCache,
+    SecretGroup,
+    SecretsUnavailableError,
+    leader_only,
+)
+from ops import Application, Model, Relation, SecretInfo, Unit
+
+logger = logging.getLogger(__name__)
+
+
+def secret_id_key(secret_id: str) -> str:
+    """Return the unique part of a secret id, regardless of its form (with or without model)."""
+    return secret_id.rsplit("/", 1)[-1].rsplit(":", 1)[-1]
+
+
+class TrackedSecret(CachedSecret):
+    """CachedSecret keeping track of the revision of the secret, which can be invalidated."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._secret_info: Optional[SecretInfo] = None
+        self._revision: Optional[int] = None
+
+    def set_content(self, content: dict[str, str]) -> None:
+        """Set the content of the secret, creating exactly one new revision on change."""
+        if not self.meta or content == self.get_content():
+            return
+
+        super().set_content(content)
+        if content:
+            self._secret_info = None
+            if self._revision is not None:
+                self._revision += 1
+        else:
+            self.invalidate()
+
+    def replace_content(self, content: dict[str, str]) -> None:
+        """Set the content of the secret without reading the current one, creating a revision.
+
+        Meant for callers which know that the content changed, and which set all of it.
+        """
+        if not self.meta:
+            return
+
+        self._legacy_migration_to_new_label_if_needed()
+        self.meta.set_content(content)
+        self._secret_content = content
+        self._secret_info = None
+        if self._revision is not None:
+            self._revision += 1
+
+    def get_info(self) -> Optional[SecretInfo]:
+        """Return the info of the secret, read from Juju at most once."""
+        if not self._secret_info and self.meta:
+            self._secret_info = self.meta.get_info()
+            self._revision = self._secret_info.revision
+        return self._secret_info
+
+    @property
+    def revision(self) -> Optional[int]:
+        """The revision of the secret, as last read or written through this cache."""
+        if self._revision is None:
+            self.get_info()
+        return self._revision
+
+    @property
+    def id(self) -> Optional[str]:
+        """The id of the secret, if known without a call to Juju."""
+        if self._secret_meta and self._secret_meta.id:
+            return self._secret_meta.id
+        return self._secret_uri
+
+    def invalidate(self) -> None:
+        """Forget the cached content and metadata, e.g. once a new revision was published."""
+        self._secret_content = {}
+        self._secret_meta = None
+        self._secret_info = None
+        self._revision = None
+
+    def remove(self) -> None:
+        """Remove the secret."""
+        super().remove()
+        self.invalidate()
+
+
+class SharedSecretCache(SecretCache):
+    """SecretCache of TrackedSecret objects, which can be shared by all the Data objects.
+
+    Use SharedSecretCache.shared() to get the cache of a component within a dispatch, which
+    reads each secret from Juju at most once. The cache can be used from several threads: the
+    secrets are read from Juju outside of its lock, so that distinct secrets are read
+    concurrently.
+    """
+
+    _shared: "WeakKeyDictionary[Model, dict[str, SharedSecretCache]]" = WeakKeyDictionary()
+
+    def __init__(self, model: Model, component: Union[Application, Unit]):
+        super().__init__(model, component)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, model: Model, component: Union[Application, Unit]) -> "SharedSecretCache":
+        """Return the cache of the component, shared within the model (i.e. the dispatch)."""
+        caches = cls._shared.setdefault(model, {})
+        if component.name not in caches:
+            caches[component.name] = cls(model, component)
+        return caches[component.name]
+
+    def get(
+        self, label: str, uri: Optional[str] = None, legacy_labels: list[str] = []
+    ) -> Optional[CachedSecret]:
+        """Get a secret from the cache, or from the Juju secret store."""
+        with self._lock:
+            if secret := self._secrets.get(label):
+                return secret
+
+        secret = TrackedSecret(
+            self._model, self.component, label, uri, legacy_labels=legacy_labels
+        )
+        if not secret.meta:
+            return None
+        with self._lock:
+            return self._secrets.setdefault(label, secret)
+
+    def add(self, label: str, content: dict[str, str], relation: Relation) -> CachedSecret:
+        """Add a secret to the Juju secret store."""
+        with self._lock:
+            if self._secrets.get(label):
+                raise SecretAlreadyExistsError(f"Secret {label} already exists")
+
+        secret = TrackedSecret(self._model, self.component, label)
+        secret.add_secret(content, relation)
+        with self._lock:
+            self._secrets[label] = secret
+        return secret
+
+    def remove(self, label: str) -> None:
+        """Remove a secret from the Juju secret store and the cache."""
+        if secret := self.get(label):
+            try:
+                secret.remove()
+            except SecretsUnavailableError:
+                pass
+            else:
+                with self._lock:
+                    self._secrets.pop(label, None)
+                return
+        logger.debug("Non-existing Juju Secret was attempted to be removed %s", label)
+
+    def invalidate(self, secret_id: Optional[str] = None, label: Optional[str] = None) -> None:
+        """Forget the cached content of a secret, e.g. on secret-changed.
+
+        The secret is matched by id or by label, whichever is provided.
+        """
+        with self._lock:
+            secrets = list(self._secrets.items())
+
+        for cached_label, secret in secrets:
+            if not isinstance(secret, TrackedSecret):
+                continue
+            if (label and cached_label == label) or (
+                secret_id and secret.id and secret_id_key(secret.id) == secret_id_key(secret_id)
+            ):
+                secret.invalidate()
+
+
+class IndexedData(Data):
+    """Data sharing its secret cache, and indexing relations and secret groups.
+
+    The relations are resolved by id through an index, the secret fields are arranged under
+    their group once per set of fields, and the secrets are read at most once per dispatch.
+    Many relations can be updated with the same data at once.
+    """
+
+    def __init__(self, model: Model, relation_name: str) -> None:
+        super().__init__(model, relation_name)
+        self.secrets = SharedSecretCache.shared(self._model, self.component)
+        # Secret field names arranged under their group, by set of secret field names
+        self._secret_groups_index: dict[frozenset[str], dict[SecretGroup, list[str]]] = {}
+        self._relation_indexes: dict[str, tuple[list[Relation], dict[int, Relation]]] = {}
+        # Guards the indexes, the relations may be updated from several threads
+        self._indexes_lock = threading.Lock()
+
+    def _group_secret_fields(self, secret_fields: Iterable[str]) -> dict[SecretGroup, list[str]]:
+        """Arrange secret fields under their group, once per set of fields.
+
+        NOTE: All unrecognized items end up in the 'extra' secret bucket.
+        The result is shared by all the callers, and must not be modified.
+        """
+        index_key = frozenset(secret_fields)
+        with self._indexes_lock:
+            if (grouped := self._secret_groups_index.get(index_key)) is not None:
+                return grouped
+
+            grouped = {}
+            for key in sorted(index_key):
+                group = self.secret_label_map.get(key, SECRET_GROUPS.EXTRA)
+                grouped.setdefault(group, []).append(key)
+            self._secret_groups_index[index_key] = grouped
+            return grouped
+
+    def _relation_index(self, relation_name: str) -> dict[int, Relation]:
+        """Relations of the given name by id, rebuilt whenever the model reloads them."""
+        relations = self._model.relations[relation_name]
+        with self._indexes_lock:
+            cached = self._relation_indexes.get(relation_name)
+            if not cached or cached[0] is not relations:
+                cached = (relations, {relation.id: relation for relation in relations})
+                self._relation_indexes[relation_name] = cached
+            return cached[1]
+
+    def _get_relations(
+        self, relation_name: str, relation_ids: Optional[list[int]]
+    ) -> list[Relation]:
+        """Retrieve the relations of the given ids (all relations if None), in order.
+
+        Relations that are gone (e.g. on relation-broken) are still resolved.
+        """
+        if not relation_ids:
+            return self.relations
+
+        index = self._relation_index(relation_name)
+        return [
+            index.get(relation_id) or self.get_relation(relation_name, relation_id)
+            for relation_id in dict.fromkeys(relation_ids)
+        ]
+
+    def fetch_relation_data(
+        self,
+        relation_ids: Optional[list[int]] = None,
+        fields: Optional[list[str]] = None,
+        relation_name: Optional[str] = None,
+    ) -> dict[int, dict[str, str]]:
+        """Retrieve data from the remote side of the relations, resolved through the index."""
+        self._legacy_apply_on_fetch()
+
+        return {
+            relation.id: self._fetch_specific_relation_data(relation, fields)
+            for relation in self._get_relations(relation_name or self.relation_name, relation_ids)
+        }
+
+    def fetch_my_relation_data(
+        self,
+        relation_ids: Optional[list[int]] = None,
+        fields: Optional[list[str]] = None,
+        relation_name: Optional[str] = None,
+    ) -> Optional[dict[int, dict[str, str]]]:
+        """Retrieve our own data from the relations, resolved through the index."""
+        self._legacy_apply_on_fetch()
+
+        return {
+            relation.id: self._fetch_my_specific_relation_data(relation, fields)
+            for relation in self._get_relations(relation_name or self.relation_name, relation_ids)
+        }
+
+    @leader_only
+    def bulk_update_relation_data(
+        self, relation_ids: list[int], data: dict[str, str]
+    ) -> dict[int, Optional[Exception]]:
+        """Update many relations with the same data.
+
+        Equivalent to calling update_relation_data() on each relation, except that the legacy
+        compatibility functions are applied once, and the secret fields are arranged under
+        their group once for all the relations.
+
+        A failure on a relation does not prevent updating the remaining ones.
+
+        Returns:
+            the error raised while updating each relation, None if the update succeeded.
+        """
+        self._legacy_apply_on_update(list(data.keys()))
+
+        results = {}
+        for relation_id in relation_ids:
+            try:
+                relation = self.get_relation(self.relation_name, relation_id)
+                self._update_relation_data(relation, data)
+            except Exception as e:
+                logger.error("Failed to update relation %s: %r", relation_id, e)
+                results[relation_id] = e
+            else:
+                results[relation_id] = None
+        return results
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Parsing of the signing key material published to the requirers."""
+
+import base64
+import binascii
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Labels of the PEM blocks holding a verification key
+PEM_PUBLIC_LABELS = ("PUBLIC KEY", "RSA PUBLIC KEY", "CERTIFICATE")
+
+# Members required by each key type of a JWK, and the members only private keys have
+JWK_MEMBERS = {
+    "oct": ("k",),
+    "RSA": ("n", "e"),
+    "EC": ("crv", "x", "y"),
+    "OKP": ("crv", "x"),
+}
+JWK_PRIVATE_MEMBERS = ("d", "p", "q", "dp", "dq", "qi")
+
+# Shortest HMAC key accepted by RFC 7518 for HS256, shorter keys are only warned about
+MIN_HMAC_KEY_BYTES = 32
+
+PEM_BLOCK = re.compile(r"-----BEGIN ([A-Z0-9 ]+)-----(.*?)-----END \1-----", re.DOTALL)
+BASE64 = re.compile(r"[A-Za-z0-9+/_-]+")
+
+
+class InvalidSigningKeyError(Exception):
+    """The signing key material cannot be used by the requirers."""
+
+
+def decode_base64(value: str) -> bytes:
+    """Decode standard or url-safe base64, with or without padding."""
+    value = value.rstrip("=")
+    if not BASE64.fullmatch(value) or len(value) % 4 == 1:
+        raise ValueError("invalid base64")
+    return base64.urlsafe_b64decode(value.replace("+", "-").replace("/", "_") + "==")
+
+
+def _check_pem(value: str) -> int:
+    """Check the PEM blocks of a key entry, returning their number."""
+    blocks = list(PEM_BLOCK.finditer(value))
+    if not blocks:
+        raise InvalidSigningKeyError("PEM key has no matching BEGIN and END lines")
+    if PEM_BLOCK.sub("", value).strip():
+        raise InvalidSigningKeyError("PEM key has text outside of its BEGIN and END lines")
+
+    for block in blocks:
+        label = block.group(1)
+        if "PRIVATE" in label:
+            raise InvalidSigningKeyError(f"PEM key is a {label}, only public keys can be shared")
+        if label not in PEM_PUBLIC_LABELS:
+            raise InvalidSigningKeyError(f"PEM block {label} is not a public key or certificate")
+        try:
+            der = decode_base64("".join(block.group(2).split()))
+        except (ValueError, binascii.Error):
+            raise InvalidSigningKeyError(f"PEM {label} is not valid base64")
+        # every public key and certificate structure is an ASN.1 sequence
+        if der[:1] != b"\x30":
+            raise InvalidSigningKeyError(f"PEM {label} does not hold a DER structure")
+    return len(blocks)
+
+
+def _check_jwk(jwk: object) -> None:
+    """Check a JSON Web Key."""
+    if not isinstance(jwk, dict):
+        raise InvalidSigningKeyError("JWK must be a JSON object")
+    if (kty := jwk.get("kty")) not in JWK_MEMBERS:
+        raise InvalidSigningKeyError(f"JWK has unknown key type {kty}")
+    if missing := [member for member in JWK_MEMBERS[kty] if not jwk.get(member)]:
+        raise InvalidSigningKeyError(f"{kty} JWK misses members {missing}")
+    if kty != "oct" and any(member in jwk for member in JWK_PRIVATE_MEMBERS):
+        raise InvalidSigningKeyError(f"{kty} JWK is a private key, only public keys can be shared")
+
+
+def _check_hmac(value: str) -> None:
+    """Check a base64-encoded HMAC key."""
+    try:
+        key = decode_base64(value)
+    except (ValueError, binascii.Error):
+        raise InvalidSigningKeyError("HMAC key is not valid base64, nor a PEM public key or a JWK")
+    if len(key) < MIN_HMAC_KEY_BYTES:
+        logger.warning(f"HMAC key is {len(key) * 8} bits, RFC 7518 requires at least 256")
+
+
+def _parse_jwks(value: str) -> list[str]:
+    """Parse a JWK or a JWK set."""
+    try:
+        jwk = json.loads(value)
+    except json.JSONDecodeError as e:
+        raise InvalidSigningKeyError(f"JWK is not valid JSON: {e.msg}")
+
+    keys = jwk.get("keys") if isinstance(jwk, dict) and "keys" in jwk else [jwk]
+    if not isinstance(keys, list) or not keys:
+        raise InvalidSigningKeyError("JWK set must hold a non-empty list of keys")
+    for jwk in keys:
+        _check_jwk(jwk)
+    return ["jwk"] * len(keys)
+
+
+def _parse_entry(entry: str) -> list[str]:
+    """Parse an entry of a comma-separated list of keys."""
+    if not entry:
+        raise InvalidSigningKeyError("empty entry in the list of keys")
+    if entry.startswith("-----"):
+        return ["pem"] * _check_pem(entry)
+
+    _check_hmac(entry)
+    return ["hmac"]
+
+
+def parse_signing_key(value: str) -> list[str]:
+    """Parse the `signing-key` field of a secret, as published to the requirers.
+
+    The field holds a JWK or JWK set, or a comma-separated list of base64-encoded HMAC keys
+    or of PEM public keys, each entry possibly holding several PEM blocks.
+
+    Returns:
+        list[str]: the kind of each key, `hmac`, `pem` or `jwk`.
+
+    Raises:
+        InvalidSigningKeyError: with the reason the key material is invalid.
+    """
+    if not (value := value.strip()):
+        raise InvalidSigningKeyError("signing-key is empty")
+
+    if value.startswith("{"):
+        return _parse_jwks(value)
+
+    entries = [entry.strip() for entry in value.split(",")]
+    kinds = []
+    for position, entry in enumerate(entries, start=1):
+        try:
+            kinds += _parse_entry(entry)
+        except InvalidSigningKeyError as e:
+            prefix = f"key {position} of {len(entries)}: " if len(entries) > 1 else ""
+            raise InvalidSigningKeyError(f"{prefix}{e}")
+
+    if len(set(kinds)) > 1:
+        raise InvalidSigningKeyError("list of keys mixes HMAC keys and PEM public keys")
+    return kinds
@@ -6,62 +6,195 @@
 """Definition of data model class(es)."""
 
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from enum import Enum
 from typing import Optional
 
 from charms.data_platform_libs.v0.data_interfaces import (
-    Data,
+    SECRET_GROUPS,
+    SecretGroup,
+    juju_secrets_only,
 )
+from charms.jwt_integrator.v0.jwt_configuration import SECRET_FIELDS, JwtConfiguration
 from ops import Model, Relation
 
+from core.data_interfaces import IndexedData, TrackedSecret
+
 logger = logging.getLogger(__name__)
 
 
 @dataclass
-class JWTAuthConfiguration:
+class JWTAuthConfiguration(JwtConfiguration):
     """Model class for the configuration parameters of JWT authentication."""
 
-    signing_key: str
-    roles_key: str
-    jwt_header: Optional[str] = None
-    jwt_url_parameter: Optional[str] = None
-    subject_key: Optional[str] = None
-    required_audience: Optional[str] = None
-    required_issuer: Optional[str] = None
-    jwt_clock_skew_tolerance: Optional[int] = None
+
+@dataclass
+class PublishLedgerEntry:
+    """Record of the data published to a relation."""
+
+    digest: str
+    secret_id: Optional[str] = None
+    revision: Optional[int] = None
+    # digests of the public fields, and of each secret field, unknown for older entries
+    public_digest: Optional[str] = None
+    secret_digests: Optional[dict[str, str]] = None
 
     def to_dict(self) -> dict:
-        """Return the JWT configuration parameters as a dictionary."""
-        data = {
-            "signing-key": self.signing_key,
-            "roles-key": self.roles_key,
+        """Return the ledger entry as a dictionary."""
+        return {
+            "digest": self.digest,
+            "secret-id": self.secret_id,
+            "revision": self.revision,
+            "public-digest": self.public_digest,
+            "secret-digests": self.secret_digests,
         }
 
-        if self.jwt_header:
-            data["jwt-header"] = self.jwt_header
+    @classmethod
+    def from_dict(cls, data: dict) -> "PublishLedgerEntry":
+        """Create a ledger entry from its dictionary representation."""
+        return cls(
+            digest=data["digest"],
+            secret_id=data.get("secret-id"),
+            revision=data.get("revision"),
+            public_digest=data.get("public-digest"),
+            secret_digests=data.get("secret-digests"),
+        )
+
+
+@dataclass
+class RevocationBucket:
+    """The revoked tokens expiring within a bucket, by id, with their expiry.
+
+    The first `filtered` tokens, in order of revocation, are published in the Bloom filter,
+    the others in full.
+    """
+
+    tokens: dict[str, int] = field(default_factory=dict)
+    filtered: int = 0
+    filter: Optional[dict] = None
+
+    @property
+    def overflow(self) -> list[str]:
+        """The tokens revoked since the Bloom filter was last rebuilt."""
+        return list(self.tokens)[self.filtered :]
+
+    def to_payload(self) -> dict:
+        """Return the bucket as published to the requirers."""
+        payload: dict = {}
+        if self.filter:
+            payload["filter"] = self.filter
+        if overflow := self.overflow:
+            payload["tokens"] = overflow
+        return payload
+
+    def to_dict(self) -> dict:
+        """Return the bucket as a dictionary."""
+        return {"tokens": self.tokens, "filtered": self.filtered, "filter": self.filter}
 
-        if self.jwt_url_parameter:
-            data["jwt-url-parameter"] = self.jwt_url_parameter
+    @classmethod
+    def from_dict(cls, data: dict) -> "RevocationBucket":
+        """Create the bucket from its dictionary representation."""
+        return cls(
+            tokens=data.get("tokens", {}),
+            filtered=data.get("filtered", 0),
+            filter=data.get("filter"),
+        )
 
-        if self.subject_key:
-            data["subject-key"] = self.subject_key
 
-        if self.required_audience:
-            data["required-audience"] = self.required_audience
+class MutationType(str, Enum):
+    """The hook tools through which a publish mutates the model."""
 
-        if self.required_issuer:
-            data["required-issuer"] = self.required_issuer
+    RELATION_SET = "relation-set"
+    # relation-set with an empty value, removing a single key
+    RELATION_DELETE = "relation-delete"
+    SECRET_ADD = "secret-add"
+    SECRET_GRANT = "secret-grant"
+    SECRET_SET = "secret-set"
 
-        if self.jwt_clock_skew_tolerance:
-            data["jwt-clock-skew-tolerance"] = str(self.jwt_clock_skew_tolerance)
 
-        return data
+@dataclass(frozen=True)
+class Mutation:
+    """A single hook tool call mutating the model."""
+
+    type: MutationType
+    relation_id: int
+    keys: tuple[str, ...] = ()
+
+    def to_dict(self) -> dict:
+        """Return the mutation as a dictionary."""
+        return {"type": self.type.value, "relation-id": self.relation_id, "keys": list(self.keys)}
+
+
+@dataclass
+class RelationPublish:
+    """The planned publish of the payload of an issuer profile to a single relation."""
+
+    relation_id: int
+    generation: int
+    profile: str
+    digest: str
+    public_digest: Optional[str] = None
+    secret_digests: Optional[dict[str, str]] = None
+    changed_fields: list[str] = field(default_factory=list)
+    update: dict[str, str] = field(default_factory=dict)
+    removed_fields: list[str] = field(default_factory=list)
+    mutations: list[Mutation] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """Return the planned publish as a dictionary, leaving out the values."""
+        return {
+            "relation-id": self.relation_id,
+            "profile": self.profile,
+            "generation": self.generation,
+            "changed-fields": self.changed_fields,
+            "mutations": [mutation.to_dict() for mutation in self.mutations],
+        }
+
+
+@dataclass
+class PublishPlan:
+    """The mutations needed to publish the payloads to the relations."""
 
+    steps: list[RelationPublish] = field(default_factory=list)
+    invalid_profiles: list[str] = field(default_factory=list)
 
-class JwtProviderData(Data):
+    @property
+    def mutations(self) -> list[Mutation]:
+        """All the mutations of the plan, in order of execution."""
+        return [mutation for step in self.steps for mutation in step.mutations]
+
+    @property
+    def size(self) -> int:
+        """The number of hook tool calls needed to execute the plan."""
+        return len(self.mutations)
+
+    def to_dict(self) -> dict:
+        """Return the plan as a dictionary, leaving out the values."""
+        return {
+            "size": self.size,
+            "invalid-profiles": self.invalid_profiles,
+            "relations": [step.to_dict() for step in self.steps if step.mutations],
+        }
+
+
+class PublishError(Exception):
+    """Publishing the configuration failed on some of the relations."""
+
+    def __init__(self, failures: dict[int, Exception]):
+        self.failures = dict(sorted(failures.items()))
+        super().__init__(
+            "Failed to publish to relation ids "
+            + ", ".join(
+                f"{relation_id} ({error!r})" for relation_id, error in self.failures.items()
+            )
+        )
+
+
+class JwtProviderData(IndexedData):
     """Implements the provider side of JWT configuration relation.
 
-    This class inherits directly from data_interfaces.Data and not from ProviderData because
+    This class inherits from data_interfaces.Data (through the charm's IndexedData) and not
+    from ProviderData because
     the JWT interface does not need a request-field from requirer side in the databag before
     the data from provider side is added. Thereby we avoid running into `PrematureDataAccessError`
     in `update_relation_data`.
@@ -69,8 +202,81 @@ class JwtProviderData(Data):
 
     def __init__(self, model: Model, relation_name: str) -> None:
         super().__init__(model, relation_name)
+        self._local_secret_fields = list(SECRET_FIELDS)
+        self._remote_secret_fields = []
 
     def _load_secrets_from_databag(self, relation: Relation) -> None:
-        """Load secrets from the databag."""
-        self._local_secret_fields = ["signing-key"]
-        self._remote_secret_fields = []
+        """Load secrets from the databag.
+
+        The secret fields are the same on every relation, they are set once on creation.
+        """
+
+    def relation_secret_label(self, relation_id: int) -> str:
+        """Return the label of the secret holding the secret fields of a relation."""
+        return self._generate_secret_label(self.relation_name, relation_id, SECRET_GROUPS.EXTRA)
+
+    @property
+    def relation_secret_field(self) -> str:
+        """The databag field referring to the secret holding the secret fields."""
+        return self._generate_secret_field_name(SECRET_GROUPS.EXTRA)
+
+    def relation_secret_id(self, relation_id: int) -> Optional[str]:
+        """Return the id of the secret holding the secret fields of a relation."""
+        relation = self.get_relation(self.relation_name, relation_id)
+        return relation.data[self.component].get(self.relation_secret_field)
+
+    def fetch_my_public_relation_data(self, relation_id: int) -> dict[str, str]:
+        """Return our own data in a relation, leaving out the secret fields.
+
+        Unlike fetch_my_relation_data(), the secret holding the secret fields is not read.
+        """
+        relation = self.get_relation(self.relation_name, relation_id)
+        if not (
+            fields := [
+                field for field in relation.data[self.component] if field not in SECRET_FIELDS
+            ]
+        ):
+            return {}
+
+        return self.fetch_my_relation_data([relation_id], fields).get(relation_id, {})
+
+    @juju_secrets_only
+    def _update_relation_secret(
+        self,
+        relation: Relation,
+        group_mapping: SecretGroup,
+        secret_fields: set[str],
+        data: dict[str, str],
+    ) -> bool:
+        """Replace the content of the secret of a relation, without reading the current one.
+
+        The charm updates all the secret fields at once, and only when one of them changed.
+        """
+        if not isinstance(
+            secret := self._get_relation_secret(relation.id, group_mapping), TrackedSecret
+        ):
+            logger.error(f"Can't update secret for relation {relation.id}")
+            return False
+
+        secret.replace_content(self._content_for_secret_group(data, secret_fields, group_mapping))
+        return True
+
+    def relation_secret_revision(self, relation_id: int) -> Optional[int]:
+        """Return the current revision of the secret holding the secret fields of a relation."""
+        if not (secret := self.secrets.get(self.relation_secret_label(relation_id))):
+            return None
+
+        return secret.revision
+
+    def remove_relation_secret(self, relation_id: int) -> bool:
+        """Remove the secret holding the secret fields of a relation.
+
+        Returns:
+            bool: whether a secret was found and removed.
+        """
+        label = self.relation_secret_label(relation_id)
+        if not self.secrets.get(label):
+            return False
+
+        self.secrets.remove(label)
+        return True
@@ -5,14 +5,54 @@
 
 """Charm State definition and parsing logic."""
 
+import hashlib
+import hmac
+import json
 import logging
-from typing import TYPE_CHECKING, Optional
+import secrets
+from bisect import insort_right
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Literal, Mapping, Optional
 
+import yaml
+from charms.jwt_integrator.v0.jwt_configuration import (
+    REQUIRED_FIELDS,
+    REVOCATION_FIELD_PREFIX,
+    InvalidRoleMappingError,
+    compile_role_mapping,
+    is_revocation_field,
+    validate_options,
+)
+from data_platform_helpers.advanced_statuses.components import PRIORITIES
+from data_platform_helpers.advanced_statuses.models import StatusObject, StatusObjectList
 from data_platform_helpers.advanced_statuses.protocol import StatusesState, StatusesStateProtocol
-from ops import ModelError, Object, SecretNotFoundError
+from data_platform_helpers.advanced_statuses.types import Scope
+from ops import (
+    CommitEvent,
+    ModelError,
+    Object,
+    Relation,
+    Secret,
+    SecretNotFoundError,
+    StoredState,
+)
 
-from core.models import JWTAuthConfiguration, JwtProviderData
-from literals import JWT_CONFIG_RELATION, STATUS_PEERS_RELATION
+from core.data_interfaces import secret_id_key
+from core.key_material import InvalidSigningKeyError, parse_signing_key
+from core.models import (
+    JWTAuthConfiguration,
+    JwtProviderData,
+    PublishLedgerEntry,
+    RevocationBucket,
+)
+from literals import (
+    DEFAULT_PROFILE,
+    JWT_CONFIG_RELATION,
+    MAX_PUBLISH_PARALLELISM,
+    PUBLISH_LEDGER_PREFIX,
+    SIGNING_KEY_LABEL,
+    STATUS_PEERS_RELATION,
+)
 
 if TYPE_CHECKING:
     from src.charm import JwtIntegratorCharm
@@ -20,66 +60,632 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+class PeerStatusesState(StatusesState):
+    """Statuses stored in the peer relation, written at the end of the hook if they changed.
+
+    Statuses are recomputed by clearing those of a component and adding them back one by one.
+    The updates are buffered during the hook and, on commit, the statuses which differ from the
+    stored ones are written through the helper's own operations, so that recomputing unchanged
+    statuses neither calls `relation-set` nor triggers relation-changed on the peers.
+    """
+
+    def __init__(self, parent: Object, status_relation_name: str):
+        super().__init__(parent, status_relation_name)
+        self._pending: dict[tuple[Scope, str], StatusObjectList] = {}
+        self.framework.observe(self.framework.on.commit, self._on_commit)
+
+    def _writable(self, scope: Scope) -> bool:
+        """Whether the statuses of a scope can be stored by this unit."""
+        if scope == "app" and not self.model.unit.is_leader():
+            logger.warning("Cannot update app status on a non-leader unit.")
+            return False
+        if not self.relation:
+            logger.warning(
+                "No databag present for statuses, the status could not be persisted for use in next events."
+            )
+            return False
+        return True
+
+    def _buffered(self, scope: Scope, component: str) -> StatusObjectList:
+        """The statuses of a component, as buffered for the rest of the hook."""
+        if (scope, component) not in self._pending:
+            self._pending[scope, component] = super().get(scope, component)
+        return self._pending[scope, component]
+
+    def add(self, status: StatusObject, scope: Scope, component: str) -> None:
+        """Add a status to the component, keeping the statuses by decreasing priority."""
+        if not self._writable(scope):
+            return
+        if status not in (statuses := self._buffered(scope, component)):
+            insort_right(
+                statuses.root, status, key=lambda status: -PRIORITIES.get(status.status, 0)
+            )
+
+    def set(self, status: StatusObject, scope: Scope, component: str) -> None:
+        """Set the component to a single status."""
+        if self._writable(scope):
+            self._pending[scope, component] = StatusObjectList(root=[status])
+
+    def delete(self, status: StatusObject, scope: Scope, component: str) -> None:
+        """Delete a status from the component."""
+        if not self._writable(scope):
+            return
+        try:
+            self._buffered(scope, component).remove(status)
+        except ValueError:
+            logger.warning(
+                f"Tried to delete status {status} in scope {scope} but it was not present"
+            )
+
+    def clear(self, scope: Scope, component: str) -> None:
+        """Clear all statuses from the component."""
+        if self._writable(scope):
+            self._pending[scope, component] = StatusObjectList(root=[])
+
+    def get(
+        self,
+        scope: Scope,
+        component: str,
+        running_status_only: bool = False,
+        running_status_type: Literal["all", "blocking", "async"] = "all",
+    ) -> StatusObjectList:
+        """Get the statuses of a component, including those buffered during the hook."""
+        if (scope, component) not in self._pending:
+            return super().get(scope, component, running_status_only, running_status_type)
+
+        statuses = self._pending[scope, component].root
+        if running_status_only:
+            statuses = [
+                status
+                for status in statuses
+                if status.running
+                and (running_status_type == "all" or status.running == running_status_type)
+            ]
+        return StatusObjectList(root=list(statuses))
+
+    def _on_commit(self, _: CommitEvent) -> None:
+        """Write the statuses which changed during the hook."""
+        for (scope, component), statuses in self._pending.items():
+            stored = super().get(scope, component)
+            if stored.model_dump_json() == statuses.model_dump_json():
+                continue
+            if not statuses.root:
+                super().clear(scope, component)
+                continue
+            # a single status is written with one `relation-set`, any other is added to it
+            super().set(statuses[0], scope, component)
+            for status in statuses.root[1:]:
+                super().add(status, scope, component)
+        self._pending.clear()
+
+
 class State(Object, StatusesStateProtocol):
     """Properties and relations of the charm."""
 
+    _stored = StoredState()
+
     def __init__(self, charm: "JwtIntegratorCharm"):
         super().__init__(parent=charm, key="charm_state")
+        # the key material is only known to the checks by a digest salted per unit
+        self._stored.set_default(
+            reconcile_cursor=-1, signing_key_checks={}, signing_key_salt=secrets.token_hex(32)
+        )
 
         self.charm = charm
         self.statuses_relation_name = STATUS_PEERS_RELATION
-        self.statuses = StatusesState(self, self.statuses_relation_name)
+        self.statuses = PeerStatusesState(self, self.statuses_relation_name)
         self.charm_config = charm.config
+        self._secret_contents: dict[str, dict[str, str]] = {}
+        # Secrets which changed during the dispatch, by unique part of their id
+        self._changed_secrets: dict[str, Secret] = {}
 
-    @property
+    @cached_property
     def provider_data_interface(self) -> JwtProviderData:
-        """Get the etcd provides interface."""
+        """Get the jwt provides interface."""
         return JwtProviderData(self.model, relation_name=JWT_CONFIG_RELATION)
 
+    @property
+    def peer_relation(self) -> Optional[Relation]:
+        """Get the peer relation."""
+        return self.model.get_relation(STATUS_PEERS_RELATION)
+
+    @property
+    def publish_ledger(self) -> dict[int, PublishLedgerEntry]:
+        """The record of the data published to each relation, shared through the peer relation."""
+        if not self.peer_relation:
+            return {}
+
+        return {
+            int(key[len(PUBLISH_LEDGER_PREFIX) :]): PublishLedgerEntry.from_dict(json.loads(value))
+            for key, value in self.peer_relation.data[self.model.app].items()
+            if key.startswith(PUBLISH_LEDGER_PREFIX)
+        }
+
+    def save_publish_ledger(self, ledger: dict[int, PublishLedgerEntry]) -> None:
+        """Persist the publish ledger in the peer relation, under a key per relation.
+
+        Only the entries which changed are written, and those of the relations left out of the
+        ledger are removed, so that publishing to a relation does not rewrite the whole ledger.
+        """
+        if not self.peer_relation:
+            logger.warning("No peer relation, the publish ledger cannot be persisted")
+            return
+
+        app_data = self.peer_relation.data[self.model.app]
+        stored = {
+            key: value for key, value in app_data.items() if key.startswith(PUBLISH_LEDGER_PREFIX)
+        }
+        encoded = {
+            f"{PUBLISH_LEDGER_PREFIX}{relation_id}": json.dumps(entry.to_dict())
+            for relation_id, entry in ledger.items()
+        }
+        changes = {key: value for key, value in encoded.items() if stored.get(key) != value}
+        changes |= dict.fromkeys(stored.keys() - encoded.keys(), "")
+        if changes:
+            app_data.update(changes)
+
+    @property
+    def revocation_buckets(self) -> dict[int, RevocationBucket]:
+        """The buckets of revoked tokens by start, shared through the peer relation."""
+        if not self.peer_relation:
+            return {}
+
+        return {
+            int(key[len(REVOCATION_FIELD_PREFIX) :]): RevocationBucket.from_dict(json.loads(value))
+            for key, value in self.peer_relation.data[self.model.app].items()
+            if is_revocation_field(key)
+        }
+
+    def save_revocation_buckets(self, buckets: Mapping[int, Optional[RevocationBucket]]) -> None:
+        """Persist the given buckets of revoked tokens in the peer relation, None removing one.
+
+        Only the keys of the given buckets are written.
+        """
+        if not self.peer_relation:
+            logger.warning("No peer relation, the revoked tokens cannot be persisted")
+            return
+
+        app_data = self.peer_relation.data[self.model.app]
+        for start, bucket in buckets.items():
+            key = f"{REVOCATION_FIELD_PREFIX}{start}"
+            if bucket and bucket.tokens:
+                app_data[key] = json.dumps(bucket.to_dict())
+            else:
+                app_data.pop(key, None)
+        self.__dict__.pop("issuer_profiles", None)
+
+    @property
+    def clock_skew_tolerance(self) -> int:
+        """The largest clock skew tolerance of the issuer profiles, in seconds."""
+        return max(
+            (
+                config.jwt_clock_skew_tolerance or 0
+                for config in self.issuer_profiles.values()
+                if config
+            ),
+            default=0,
+        )
+
+    @property
+    def reconcile_cursor(self) -> int:
+        """The id of the last relation checked for drift."""
+        return self._stored.reconcile_cursor
+
+    @reconcile_cursor.setter
+    def reconcile_cursor(self, relation_id: int) -> None:
+        self._stored.reconcile_cursor = relation_id
+
+    @property
+    def publish_parallelism(self) -> int:
+        """The number of relations to publish to concurrently."""
+        parallelism = self.charm_config.get("publish-parallelism", 1)
+        return min(max(parallelism, 1), MAX_PUBLISH_PARALLELISM)
+
     @property
     def jwt_auth_config(self) -> Optional[JWTAuthConfiguration]:
         """Return configuration parameters for JWT authentication."""
-        mandatory_config_parameters = ["signing-key", "roles-key"]
+        return self._build_jwt_auth_config(
+            self.charm_config, self._profile_key_content(DEFAULT_PROFILE, self.charm_config)
+        )
+
+    @cached_property
+    def managed_signing_key(self) -> Optional[dict[str, str]]:
+        """Return the content of the signing key generated by the charm, if any."""
+        try:
+            return self.model.get_secret(label=SIGNING_KEY_LABEL).get_content(refresh=True)
+        except SecretNotFoundError:
+            return None
+
+    def save_managed_signing_key(self, content: dict[str, str]) -> None:
+        """Store a signing key generated by the charm, as a new revision of its secret."""
+        try:
+            self.model.get_secret(label=SIGNING_KEY_LABEL).set_content(content)
+        except SecretNotFoundError:
+            self.model.app.add_secret(content, label=SIGNING_KEY_LABEL)
+
+        self.__dict__.pop("managed_signing_key", None)
+        self.__dict__.pop("issuer_profiles", None)
+        self.__dict__.pop("signing_key_errors", None)
+
+    @cached_property
+    def profile_options(self) -> dict[str, Mapping[str, Any]]:
+        """Return the options of each issuer profile, the charm options being the default one."""
+        options: dict[str, Mapping[str, Any]] = {DEFAULT_PROFILE: self.charm_config}
+        for name, profile_options in self._parse_mapping("issuer-profiles").items():
+            if name == DEFAULT_PROFILE:
+                logger.error(f"Profile name {DEFAULT_PROFILE} is reserved for the charm options")
+                continue
+
+            options[str(name)] = profile_options
+        return options
+
+    @cached_property
+    def issuer_profiles(self) -> dict[str, Optional[JWTAuthConfiguration]]:
+        """Return the configuration of each issuer profile, None for invalid profiles.
+
+        The charm options make up the default profile, the others are defined by the
+        `issuer-profiles` option with the same option names.
+        """
+        profiles: dict[str, Optional[JWTAuthConfiguration]] = {}
+        for name, options in self.profile_options.items():
+            if not isinstance(options, Mapping):
+                logger.error(f"Options of profile {name} must be a mapping")
+                profiles[name] = None
+                continue
+
+            logger.debug(f"Loading issuer profile {name}")
+            profiles[name] = self._build_jwt_auth_config(
+                options, self._profile_key_content(name, options)
+            )
+
+        # issuer entries are built from the profiles as loaded above
+        issuers = {
+            name: self._build_issuers(name, profiles)
+            for name in profiles
+            if profiles[name] and self.trusted_issuers(name)
+        }
+        for name, profile_issuers in issuers.items():
+            if profile_issuers is None:
+                profiles[name] = None
+            else:
+                profiles[name].issuers = profile_issuers
+                # audiences are published apart from the keys, as changing them needs a restart
+                profiles[name].issuer_audiences = self._build_issuer_audiences(name, profiles)
+
+        # revocations apply to the tokens of every issuer
+        revocations = {
+            start: bucket.to_payload() for start, bucket in self.revocation_buckets.items()
+        }
+        for config in profiles.values():
+            if config:
+                config.revocations = revocations or None
+        return profiles
+
+    def trusted_issuers(self, profile: str) -> list[str]:
+        """Return the profiles whose issuer is trusted by a profile, besides its own."""
+        options = self.profile_options.get(profile)
+        if not isinstance(options, Mapping) or not (value := options.get("trusted-issuers")):
+            return []
+
+        if isinstance(value, str):
+            return [name.strip() for name in value.split(",") if name.strip()]
+        return [str(name) for name in value]
+
+    @cached_property
+    def profile_secret_ids(self) -> dict[str, str]:
+        """Return the id of the secret holding the signing key of each issuer profile."""
+        return {
+            name: str(secret_id)
+            for name, options in self.profile_options.items()
+            if isinstance(options, Mapping) and (secret_id := options.get("signing-key"))
+        }
+
+    def signing_key_content(self, profile: str) -> Optional[dict[str, str]]:
+        """Return the content of the secret holding the signing key of a profile, if any."""
+        if not isinstance(options := self.profile_options.get(profile), Mapping):
+            return None
+
+        if key_content := self._profile_key_content(profile, options):
+            return key_content
+
+        if not (secret_id := self.profile_secret_ids.get(profile)):
+            return None
+
+        try:
+            return self.get_secret_from_id(secret_id)
+        except (ModelError, SecretNotFoundError) as e:
+            logger.error(e)
+            return None
+
+    def check_signing_key(self, source: str, signing_key: str) -> Optional[str]:
+        """Return why the signing key material of a secret is invalid, None if it is valid.
+
+        The key material is parsed again only once it changed: the outcome is kept in the
+        stored state by secret, along with an HMAC of the key material it applies to, keyed
+        with a random salt of the unit so that the stored state does not reveal the keys.
+        """
+        salt = bytes.fromhex(self._stored.signing_key_salt)
+        digest = hmac.new(salt, signing_key.encode(), hashlib.sha256).hexdigest()
+        if (check := self._stored.signing_key_checks.get(source)) and check[0] == digest:
+            return check[1] or None
+
+        try:
+            kinds = parse_signing_key(signing_key)
+            logger.debug(f"Signing key of {source} holds {len(kinds)} {kinds[0]} keys")
+            error = ""
+        except InvalidSigningKeyError as e:
+            error = str(e)
+
+        self._stored.signing_key_checks[source] = [digest, error]
+        return error or None
+
+    def prune_signing_key_checks(self) -> None:
+        """Forget the checks of the signing keys of secrets no profile is configured with."""
+        sources = {
+            self._key_source(options)
+            for options in self.profile_options.values()
+            if isinstance(options, Mapping)
+        }
+        for source in set(self._stored.signing_key_checks) - sources:
+            del self._stored.signing_key_checks[source]
+
+    @cached_property
+    def signing_key_errors(self) -> dict[str, str]:
+        """Return why the signing key material of each profile is invalid, if it is."""
+        errors = {}
+        for name, options in self.profile_options.items():
+            if not isinstance(options, Mapping):
+                continue
+
+            content = self.signing_key_content(name)
+            if not content or not (signing_key := content.get("signing-key")):
+                continue
+
+            if error := self.check_signing_key(self._key_source(options), signing_key):
+                errors[name] = error
+        return errors
+
+    @cached_property
+    def option_errors(self) -> dict[str, dict[str, str]]:
+        """Return why the invalid options of each issuer profile are invalid, by option."""
+        return {
+            name: errors
+            for name, options in self.profile_options.items()
+            if isinstance(options, Mapping) and (errors := self._validate_options(options)[1])
+        }
+
+    def profiles_using_secret(self, secret_id: str) -> list[str]:
+        """Return the profiles publishing the signing key held in a secret.
+
+        Besides the profiles the secret belongs to, this includes the profiles trusting the
+        issuer of one of them.
+        """
+        owners = {
+            profile
+            for profile, profile_secret_id in self.profile_secret_ids.items()
+            if profile_secret_id == secret_id
+        }
+        return sorted(
+            profile
+            for profile in self.profile_options
+            if profile in owners or owners.intersection(self.trusted_issuers(profile))
+        )
+
+    @cached_property
+    def profile_bindings(self) -> dict[str, str]:
+        """Return the profile bound to requirer application names and relation ids."""
+        return {
+            str(key): str(profile)
+            for key, profile in self._parse_mapping("profile-bindings").items()
+        }
+
+    def relation_profile(self, relation: Relation) -> str:
+        """Return the issuer profile of a relation, bound by relation id or application name."""
+        if profile := self.profile_bindings.get(str(relation.id)):
+            return profile
+
+        if relation.app and (profile := self.profile_bindings.get(relation.app.name)):
+            return profile
+
+        return DEFAULT_PROFILE
+
+    @cached_property
+    def profile_index(self) -> dict[str, list[Relation]]:
+        """Return the relations bound to each issuer profile."""
+        index: dict[str, list[Relation]] = {}
+        for relation in self.provider_data_interface.relations:
+            index.setdefault(self.relation_profile(relation), []).append(relation)
+        return index
+
+    def _parse_mapping(self, option: str) -> dict[Any, Any]:
+        """Parse a charm option holding a YAML (or JSON) mapping, empty if unset or invalid."""
+        if not (value := self.charm_config.get(option)):
+            return {}
+
+        try:
+            mapping = yaml.safe_load(value)
+        except yaml.YAMLError as e:
+            logger.error(f"Option {option} is not valid YAML: {e}")
+            return {}
+
+        if not isinstance(mapping, dict):
+            logger.error(f"Option {option} must be a mapping")
+            return {}
+
+        return mapping
+
+    def _profile_key_content(
+        self, profile: str, options: Mapping[str, Any]
+    ) -> Optional[dict[str, str]]:
+        """Return the generated signing key of the default profile, unless a key is configured."""
+        if profile != DEFAULT_PROFILE or options.get("signing-key"):
+            return None
+        return self.managed_signing_key
 
+    @staticmethod
+    def _key_source(options: Mapping[str, Any]) -> str:
+        """Return the secret holding the signing key of profile options, by id or label."""
+        return str(options.get("signing-key") or SIGNING_KEY_LABEL)
+
+    def _build_jwt_auth_config(
+        self, options: Mapping[str, Any], key_content: Optional[dict[str, str]] = None
+    ) -> Optional[JWTAuthConfiguration]:
+        """Build the configuration of JWT authentication from charm or profile options.
+
+        Args:
+            options: the charm or profile options.
+            key_content: the content of the secret holding the signing key, read from the
+                secret of the `signing-key` option if None.
+        """
+        mandatory_config_parameters = [
+            field for field in REQUIRED_FIELDS if not (key_content and field == "signing-key")
+        ]
         for parameter in mandatory_config_parameters:
-            if self.charm_config.get(parameter) is None:
+            if options.get(parameter) is None:
                 logger.error(f"Mandatory parameter {parameter} is missing")
                 return None
 
-        signing_key_secret = self.charm_config.get("signing-key")
+        values, errors = self._validate_options(options)
+        for option, error in errors.items():
+            logger.error(f"Invalid `{option}`: {error}")
+        if errors:
+            return None
+
         try:
-            if not (signing_key := self.get_secret_from_id(signing_key_secret).get("signing-key")):
+            if key_content is None:
+                key_content = self.get_secret_from_id(options.get("signing-key"))
+            if not (signing_key := key_content.get("signing-key")):
                 logger.error("Missing mandatory secret field for `signing-key`")
                 return None
         except (ModelError, SecretNotFoundError) as e:
             logger.error(e)
             return None
 
+        if error := self.check_signing_key(self._key_source(options), signing_key):
+            logger.error(f"Invalid `signing-key`: {error}")
+            return None
+
         return JWTAuthConfiguration(
             signing_key=signing_key,
-            roles_key=self.charm_config.get("roles-key"),
-            jwt_header=self.charm_config.get("jwt-header"),
-            jwt_url_parameter=self.charm_config.get("jwt-url-parameter"),
-            subject_key=self.charm_config.get("subject-key"),
-            required_audience=self.charm_config.get("required-audience"),
-            required_issuer=self.charm_config.get("required-issuer"),
-            jwt_clock_skew_tolerance=self.charm_config.get("jwt-clock-skew-tolerance"),
+            key_id=key_content.get("key-id"),
+            jwks=json.loads(jwks) if (jwks := key_content.get("jwks")) else None,
+            **values,
         )
 
+    @classmethod
+    def _validate_options(
+        cls, options: Mapping[str, Any]
+    ) -> tuple[dict[str, Any], dict[str, str]]:
+        """Validate charm or profile options against the schema of the configuration.
+
+        Returns:
+            tuple: the values of the options by configuration attribute, and the reason each
+                invalid option is invalid, by option.
+        """
+        values, errors = validate_options(options)
+
+        try:
+            values["role_mapping"] = cls._compile_role_mapping(options.get("role-mapping"))
+        except (yaml.YAMLError, InvalidRoleMappingError) as e:
+            errors["role-mapping"] = str(e)
+
+        # rejected tokens must not outlive the keys they were checked against
+        key_ttl, negative_ttl = values.get("key_cache_ttl"), values.get("negative_cache_ttl")
+        if key_ttl is not None and negative_ttl is not None and negative_ttl > key_ttl:
+            errors["negative-cache-ttl"] = "must not exceed `key-cache-ttl`"
+        return values, errors
+
+    @staticmethod
+    def _compile_role_mapping(rules: Any) -> Optional[dict[str, Any]]:
+        """Compile the role mapping rules, given as a mapping or its YAML (or JSON) encoding."""
+        if not rules:
+            return None
+
+        if isinstance(rules, str):
+            rules = yaml.safe_load(rules)
+        if not isinstance(rules, Mapping):
+            raise InvalidRoleMappingError("Role mapping must be a mapping")
+        return compile_role_mapping(rules)
+
+    def _build_issuers(
+        self, profile: str, profiles: Mapping[str, Optional[JWTAuthConfiguration]]
+    ) -> Optional[dict[str, dict[str, str]]]:
+        """Build the issuer entries of a profile from its own and its trusted profiles.
+
+        Every profile listed must be valid and set a distinct `required-issuer`.
+        """
+        issuers: dict[str, dict[str, str]] = {}
+        for name in [profile, *self.trusted_issuers(profile)]:
+            if not (config := profiles.get(name)) or not config.required_issuer:
+                logger.error(
+                    f"Profile {profile} trusts profile {name}, which is invalid "
+                    "or has no required-issuer"
+                )
+                return None
+
+            if config.required_issuer in issuers:
+                logger.error(
+                    f"Profile {profile} trusts issuer {config.required_issuer} more than once"
+                )
+                return None
+
+            issuers[config.required_issuer] = {"signing-key": config.signing_key}
+        return issuers
+
+    def _build_issuer_audiences(
+        self, profile: str, profiles: Mapping[str, Optional[JWTAuthConfiguration]]
+    ) -> Optional[dict[str, str]]:
+        """Build the audiences of the issuers of a profile, None if no issuer requires one.
+
+        The profile and its trusted profiles must be valid, see `_build_issuers`.
+        """
+        audiences = {
+            config.required_issuer: config.required_audience
+            for name in [profile, *self.trusted_issuers(profile)]
+            if (config := profiles[name]) and config.required_audience
+        }
+        return audiences or None
+
     def get_secret_from_id(self, secret_id: str) -> dict[str, str]:
         """Resolve the given id of a Juju secret and return the content as a dict.
 
+        The secret is read once per dispatch, in a single call, at the revision the charm
+        tracks. A secret which changed during the dispatch is read at its latest revision,
+        which the charm tracks from then on.
+
         Args:
             secret_id (str): The id of the secret.
 
         Returns:
             dict: The content of the secret.
         """
+        if secret_id in self._secret_contents:
+            return self._secret_contents[secret_id]
+
         try:
-            secret_content = self.model.get_secret(id=secret_id).get_content(refresh=True)
+            if changed := self._changed_secrets.get(secret_id_key(secret_id)):
+                secret_content = changed.get_content(refresh=True)
+            else:
+                secret_content = self.model.get_secret(id=secret_id).get_content()
         except SecretNotFoundError:
             raise SecretNotFoundError(f"The secret '{secret_id}' does not exist.")
         except ModelError:
             raise
 
+        self._secret_contents[secret_id] = secret_content
         return secret_content
+
+    def invalidate_secret(self, secret: Secret) -> None:
+        """Forget the cached content of a secret which changed, e.g. on secret-changed."""
+        if not secret.id:
+            return
+
+        key = secret_id_key(secret.id)
+        self._changed_secrets[key] = secret
+        for secret_id in [
+            secret_id for secret_id in self._secret_contents if secret_id_key(secret_id) == key
+        ]:
+            del self._secret_contents[secret_id]
+        self.provider_data_interface.secrets.invalidate(secret.id)
+        self.__dict__.pop("issuer_profiles", None)
+        self.__dict__.pop("signing_key_errors", None)
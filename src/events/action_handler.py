@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Action event handlers."""
+
+import json
+import logging
+
+import ops
+from charms.jwt_integrator.v0.jwt_configuration import JWT_CONFIGURATION_FIELDS
+from ops import Object
+
+from literals import DEFAULT_PROFILE
+from managers.signing_key import SigningKeyError
+from managers.token_minter import TokenDistribution, TokenMintingError
+
+logger = logging.getLogger(__name__)
+
+
+class ActionEvents(Object):
+    """Handle all actions."""
+
+    def __init__(self, charm):
+        super().__init__(charm, key="action_events")
+        self.charm = charm
+
+        self.framework.observe(
+            self.charm.on.remove_orphaned_secrets_action, self._on_remove_orphaned_secrets
+        )
+        self.framework.observe(self.charm.on.plan_publish_action, self._on_plan_publish)
+        self.framework.observe(self.charm.on.revoke_token_action, self._on_revoke_token)
+        self.framework.observe(self.charm.on.unrevoke_token_action, self._on_unrevoke_token)
+        self.framework.observe(
+            self.charm.on.rotate_signing_key_action, self._on_rotate_signing_key
+        )
+        self.framework.observe(self.charm.on.mint_test_tokens_action, self._on_mint_test_tokens)
+
+    def _on_remove_orphaned_secrets(self, event: ops.ActionEvent) -> None:
+        """Handle the remove-orphaned-secrets action."""
+        if not self.charm.unit.is_leader():
+            event.fail("This action can only be run on the leader unit")
+            return
+
+        if (max_relation_id := event.params.get("max-relation-id")) is None:
+            max_relation_id = max(
+                (
+                    relation.id
+                    for relations in self.model.relations.values()
+                    for relation in relations
+                ),
+                default=-1,
+            )
+
+        removed, next_relation_id = self.charm.jwt_config_manager.remove_orphaned_secrets(
+            max_relation_id, min_relation_id=event.params.get("min-relation-id", 0)
+        )
+        results = {"removed-relation-ids": json.dumps(removed), "count": len(removed)}
+        if next_relation_id is not None:
+            results["next-relation-id"] = next_relation_id
+        event.set_results(results)
+
+    def _on_plan_publish(self, event: ops.ActionEvent) -> None:
+        """Handle the plan-publish action."""
+        if not self.charm.unit.is_leader():
+            event.fail("This action can only be run on the leader unit")
+            return
+
+        assume_changed = frozenset(
+            field.strip() for field in event.params.get("assume-changed", "").split(",")
+        ) - {""}
+        if unknown_fields := sorted(assume_changed - set(JWT_CONFIGURATION_FIELDS)):
+            event.fail(f"Unknown configuration fields: {', '.join(unknown_fields)}")
+            return
+
+        plan = self.charm.jwt_config_manager.plan_publish(assume_changed)
+        event.set_results({"plan": json.dumps(plan.to_dict()), "size": plan.size})
+
+    def _on_revoke_token(self, event: ops.ActionEvent) -> None:
+        """Handle the revoke-token action."""
+        if not self.charm.unit.is_leader():
+            event.fail("This action can only be run on the leader unit")
+            return
+
+        revoked = self.charm.revocation_manager.revoke(
+            self._token_ids(event), expiry=event.params["exp"]
+        )
+        # expired buckets may have been dropped even without new revocations
+        self.charm.jwt_config_manager.update_provider_data()
+        event.set_results(
+            {"revoked": len(revoked), "total": self.charm.revocation_manager.revoked_count}
+        )
+
+    def _on_unrevoke_token(self, event: ops.ActionEvent) -> None:
+        """Handle the unrevoke-token action."""
+        if not self.charm.unit.is_leader():
+            event.fail("This action can only be run on the leader unit")
+            return
+
+        unrevoked = self.charm.revocation_manager.unrevoke(self._token_ids(event))
+        if unrevoked:
+            self.charm.jwt_config_manager.update_provider_data()
+        event.set_results(
+            {"unrevoked": len(unrevoked), "total": self.charm.revocation_manager.revoked_count}
+        )
+
+    def _on_rotate_signing_key(self, event: ops.ActionEvent) -> None:
+        """Handle the rotate-signing-key action."""
+        if not self.charm.unit.is_leader():
+            event.fail("This action can only be run on the leader unit")
+            return
+
+        try:
+            content = self.charm.signing_key_manager.rotate(event.params.get("algorithm", "HS256"))
+        except SigningKeyError as e:
+            event.fail(str(e))
+            return
+
+        self.charm.jwt_config_manager.update_provider_data()
+        event.set_results({"algorithm": content["algorithm"], "key-id": content["key-id"]})
+
+    def _on_mint_test_tokens(self, event: ops.ActionEvent) -> None:
+        """Handle the mint-test-tokens action."""
+        params = event.params
+        distribution = TokenDistribution(
+            count=params["count"],
+            expired_fraction=params.get("expired-fraction", 0.0),
+            not_yet_valid_fraction=params.get("not-yet-valid-fraction", 0.0),
+            wrong_audience_fraction=params.get("wrong-audience-fraction", 0.0),
+            roles=tuple(role.strip() for role in params.get("roles", "reader").split(",")),
+            subjects=params.get("subjects", 1000),
+            lifetime=params.get("lifetime", 3600),
+            seed=params.get("seed"),
+        )
+        path = params.get("path", "/tmp/jwt-test-tokens.txt")
+
+        try:
+            with open(path, "w") as output:
+                kinds = self.charm.token_minter.mint(
+                    params.get("profile", DEFAULT_PROFILE), distribution, output
+                )
+        except (OSError, TokenMintingError) as e:
+            event.fail(str(e))
+            return
+
+        event.set_results({"path": path, "count": distribution.count} | dict(kinds))
+
+    @staticmethod
+    def _token_ids(event: ops.ActionEvent) -> list[str]:
+        """Return the token ids of the comma-separated `jti` parameter."""
+        return [jti.strip() for jti in event.params["jti"].split(",") if jti.strip()]
@@ -24,6 +24,8 @@ class BasicEvents(Object):
         # --- Basic charm events ---
         self.framework.observe(self.charm.on.config_changed, self._on_config_changed)
         self.framework.observe(self.charm.on.secret_changed, self._on_secret_changed)
+        self.framework.observe(self.charm.on.update_status, self._on_update_status)
+        self.framework.observe(self.charm.on.leader_elected, self._on_leader_elected)
 
         # --- Relation Provider events ---
         self.framework.observe(
@@ -32,9 +34,14 @@ class BasicEvents(Object):
         self.framework.observe(
             self.charm.on[JWT_CONFIG_RELATION].relation_changed, self._on_jwt_relation_events
         )
+        self.framework.observe(
+            self.charm.on[JWT_CONFIG_RELATION].relation_broken, self._on_jwt_relation_broken
+        )
 
     def _on_config_changed(self, event: ops.ConfigChangedEvent) -> None:
         """Handle the config_changed event."""
+        self.charm.state.prune_signing_key_checks()
+
         if not self.charm.unit.is_leader():
             return
 
@@ -43,17 +50,34 @@ class BasicEvents(Object):
 
     def _on_secret_changed(self, event: ops.SecretChangedEvent) -> None:
         """Handle the secret_changed event."""
+        self.charm.state.invalidate_secret(event.secret)
+
         if not self.charm.unit.is_leader():
             return
 
-        if not (signing_key_secret := self.charm.config.get("signing-key")):
+        if not (profiles := self.charm.state.profiles_using_secret(event.secret.id)):
             return
 
-        if signing_key_secret != event.secret.id:
+        logger.debug(f"Processing secret-change for {event.secret.id} of profiles {profiles}")
+        self.charm.jwt_config_manager.update_provider_data(profiles=profiles)
+
+    def _on_leader_elected(self, event: ops.LeaderElectedEvent) -> None:
+        """Handle the leader_elected event."""
+        if not self.charm.unit.is_leader():
             return
 
-        logger.debug(f"Processing secret-change for {signing_key_secret}")
-        self.charm.jwt_config_manager.update_provider_data()
+        self.charm.jwt_config_manager.verify_publish_ledger()
+
+    def _on_update_status(self, event: ops.UpdateStatusEvent) -> None:
+        """Handle the update_status event."""
+        if not self.charm.unit.is_leader():
+            return
+
+        if self.charm.revocation_manager.expire():
+            self.charm.jwt_config_manager.update_provider_data()
+
+        if drifted := self.charm.jwt_config_manager.reconcile():
+            logger.info(f"Republished drifted relation ids {drifted}")
 
     def _on_jwt_relation_events(self, event: ops.RelationChangedEvent) -> None:
         """Handle all changes to the JWT relation from provider side."""
@@ -61,3 +85,10 @@ class BasicEvents(Object):
             return
 
         self.charm.jwt_config_manager.update_provider_data()
+
+    def _on_jwt_relation_broken(self, event: ops.RelationBrokenEvent) -> None:
+        """Clean up after a requirer left the JWT relation."""
+        if not self.charm.unit.is_leader():
+            return
+
+        self.charm.jwt_config_manager.remove_relation(event.relation.id)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Recording of the events handled by the charm, for offline replay."""
+
+import json
+import logging
+import os
+import time
+from typing import Any
+
+import ops
+from ops import Object
+
+from literals import EVENT_JOURNAL_MAX_BYTES, JOURNAL_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+class EventJournal(Object):
+    """Append the events handled by the charm, and the model they observed, to a journal.
+
+    Each line of the journal is a JSON entry holding the event, its relation, secret or
+    action, and the leadership, options and relations of the unit. Secret contents are never
+    read: secrets are only recorded by id, and by revision when the event carries it.
+
+    The journal is rotated once it exceeds `EVENT_JOURNAL_MAX_BYTES`, keeping one previous
+    file, and is replayed by `tests/benchmarks/replay_journal.py`.
+    """
+
+    def __init__(self, charm: ops.CharmBase, path: str):
+        super().__init__(charm, key="event_journal")
+        self.charm = charm
+        self.path = path
+
+        # observed before any other handler, so the entry is written even if handling fails
+        for bound_event in charm.on.events().values():
+            if issubclass(bound_event.event_type, (ops.HookEvent, ops.ActionEvent)):
+                self.framework.observe(bound_event, self._on_event)
+
+    def _on_event(self, event: ops.EventBase) -> None:
+        """Append the entry of an event to the journal."""
+        try:
+            self._append(self.entry(event))
+        except OSError as e:
+            logger.warning(f"Event {event.handle.kind} not journaled: {e}")
+
+    def entry(self, event: ops.EventBase) -> dict[str, Any]:
+        """Return the journal entry of an event."""
+        model = self.charm.model
+        entry: dict[str, Any] = {
+            "version": JOURNAL_VERSION,
+            "time": round(time.time(), 3),
+            "event": event.handle.kind,
+            "leader": model.unit.is_leader(),
+            "config": dict(model.config),
+            "relations": {
+                endpoint: {
+                    str(relation.id): relation.app.name if relation.app else None
+                    for relation in relations
+                }
+                for endpoint, relations in model.relations.items()
+                if relations
+            },
+        }
+
+        if isinstance(event, ops.RelationEvent):
+            endpoint = event.relation.name
+            entry["event"] = event.handle.kind.removeprefix(f"{endpoint.replace('-', '_')}_")
+            entry["relation"] = {
+                "endpoint": endpoint,
+                "id": event.relation.id,
+                "app": event.app.name if event.app else None,
+            }
+        elif isinstance(event, ops.SecretEvent):
+            entry["secret"] = {"id": event.secret.id, "label": event.secret.label}
+            if revision := getattr(event, "revision", None):
+                entry["secret"]["revision"] = revision
+        elif isinstance(event, ops.ActionEvent):
+            entry["event"] = "action"
+            entry["action"] = {
+                "name": event.handle.kind.removesuffix("_action").replace("_", "-"),
+                "params": dict(event.params),
+            }
+        return entry
+
+    def _append(self, entry: dict[str, Any]) -> None:
+        """Append an entry to the journal, rotating it when it is full."""
+        if os.path.exists(self.path) and os.path.getsize(self.path) > EVENT_JOURNAL_MAX_BYTES:
+            os.replace(self.path, f"{self.path}.1")
+
+        with open(self.path, "a") as journal:
+            journal.write(json.dumps(entry, separators=(",", ":"), default=str) + "\n")
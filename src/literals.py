@@ -6,3 +6,30 @@
 
 JWT_CONFIG_RELATION = "jwt-configuration"
 STATUS_PEERS_RELATION = "status-peers"
+
+# Name of the issuer profile made of the charm options
+DEFAULT_PROFILE = "default"
+
+# Number of relations checked for drift on each update-status
+RECONCILE_BATCH_SIZE = 10
+
+# Prefix of the keys of the publish ledger entries, by relation id, in the application databag
+# of the peer relation
+PUBLISH_LEDGER_PREFIX = "ledger-"
+
+# Number of relation ids probed for an orphaned secret by a run of remove-orphaned-secrets
+ORPHANED_SECRETS_PROBE_LIMIT = 500
+
+# Upper bound of the number of relations published to concurrently
+MAX_PUBLISH_PARALLELISM = 32
+
+# Number of tokens revoked in a bucket since the last rebuild of its Bloom filter, above which
+# the filter is rebuilt
+REVOCATION_OVERFLOW_LIMIT = 256
+
+# Label of the secret holding the signing key generated by the rotate-signing-key action
+SIGNING_KEY_LABEL = "jwt-integrator.signing-key"
+
+# Format version of the entries of the event journal, and size above which it is rotated
+JOURNAL_VERSION = 1
+EVENT_JOURNAL_MAX_BYTES = 16 * 1024 * 1024
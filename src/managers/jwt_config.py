@@ -4,15 +4,36 @@
 
 """Manager for handling configuration building and status computation."""
 
+import json
 import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
 
+from charms.jwt_integrator.v0.jwt_configuration import (
+    CHANGED_FIELDS_FIELD,
+    GENERATION_FIELD,
+    SECRET_FIELDS,
+    payload_digest,
+    payload_fields,
+)
 from data_platform_helpers.advanced_statuses.models import StatusObject
 from data_platform_helpers.advanced_statuses.protocol import ManagerStatusProtocol
 from data_platform_helpers.advanced_statuses.types import Scope
+from ops import Relation
 from ops.model import ConfigData
 
+from core.models import (
+    Mutation,
+    MutationType,
+    PublishError,
+    PublishLedgerEntry,
+    PublishPlan,
+    RelationPublish,
+)
 from core.state import State
-from statuses import CharmStatuses
+from literals import DEFAULT_PROFILE, ORPHANED_SECRETS_PROBE_LIMIT, RECONCILE_BATCH_SIZE
+from statuses import CharmStatuses, option_invalid
 
 logger = logging.getLogger(__name__)
 
@@ -30,27 +51,524 @@ class JwtConfigManager(ManagerStatusProtocol):
     def get_statuses(self, scope: Scope, recompute: bool = False) -> list[StatusObject]:
         """Compute the manager's statuses."""
         status_list: list[StatusObject] = []
+        profiles = self.state.issuer_profiles
 
-        if not self.state.jwt_auth_config:
+        # invalid options are reported one by one, instead of the generic statuses
+        errors = {profile: dict(errors) for profile, errors in self.state.option_errors.items()}
+        for profile, error in self.state.signing_key_errors.items():
+            errors.setdefault(profile, {})["signing-key"] = error
+        for profile, profile_errors in sorted(errors.items()):
+            for option, error in sorted(profile_errors.items()):
+                status_list.append(option_invalid(profile, option, error))
+
+        # the charm options are only required when some relation uses the default profile
+        if (
+            not profiles[DEFAULT_PROFILE]
+            and DEFAULT_PROFILE not in errors
+            and (len(profiles) == 1 or DEFAULT_PROFILE in self.state.profile_index)
+        ):
             status_list.append(CharmStatuses.CONFIG_OPTIONS_INVALID.value)
 
+        if any(
+            not profiles.get(profile)
+            for profile in profiles.keys() | self.state.profile_index.keys()
+            if profile != DEFAULT_PROFILE and profile not in errors
+        ):
+            status_list.append(CharmStatuses.ISSUER_PROFILES_INVALID.value)
+
         if not self.state.provider_data_interface.relations:
             status_list.append(CharmStatuses.NO_PROVIDER_RELATION.value)
 
         return status_list if status_list else [CharmStatuses.ACTIVE_IDLE.value]
 
-    def update_provider_data(self):
-        """Update the contents of the relation data bag."""
+    def update_provider_data(self, profiles: Iterable[str] | None = None):
+        """Update the contents of the relation data bag.
+
+        Relations whose entry in the publish ledger already matches the payload are skipped
+        without reading their data bag or secret.
+
+        Args:
+            profiles: only update the relations bound to these issuer profiles.
+        """
         if not self.state.provider_data_interface.relations:
             logger.info("No relation to update")
             return
 
-        if not self.state.jwt_auth_config:
-            logger.error("Configuration settings invalid, cannot update provider data")
-            return
+        plan = self.plan_publish(profiles=profiles)
+        for profile in plan.invalid_profiles:
+            logger.error(f"Profile {profile} invalid, cannot update the relations bound to it")
+
+        self.execute(plan)
+
+    def plan_publish(
+        self,
+        assume_changed: frozenset[str] = frozenset(),
+        profiles: Iterable[str] | None = None,
+    ) -> PublishPlan:
+        """Compute the mutations needed to publish the configuration, without applying them.
+
+        Only the relations bound to the given issuer profiles are considered, as found in the
+        profile index, so that a change to a profile does not touch the other relations.
+
+        Args:
+            assume_changed: fields to consider changed on every relation, e.g. to predict
+                the cost of rotating the signing key. Bypasses the publish ledger; such a
+                plan is meant for inspection and should not be executed.
+            profiles: the issuer profiles to publish, all of them if None.
+
+        Returns:
+            PublishPlan: the plan, listing the invalid profiles whose relations were left out.
+        """
+        index = self.state.profile_index
+        selected = index.keys() if profiles is None else index.keys() & set(profiles)
+
+        plan = PublishPlan()
+        ledger = self.state.publish_ledger
+
+        for profile in sorted(selected):
+            if not (config := self.state.issuer_profiles.get(profile)):
+                plan.invalid_profiles.append(profile)
+                continue
+
+            payload = config.to_dict()
+            digest = payload_digest(payload)
+            for relation in index[profile]:
+                entry = ledger.get(relation.id)
+                if not assume_changed and entry and entry.digest == digest:
+                    logger.debug(
+                        f"Relation id {relation.id} is up to date according to the ledger"
+                    )
+                    continue
+
+                plan.steps.append(
+                    self._plan_relation(
+                        relation.id, profile, payload, entry=entry, assume_changed=assume_changed
+                    )
+                )
+
+        plan.steps.sort(key=lambda step: step.relation_id)
+        return plan
+
+    def execute(self, plan: PublishPlan) -> None:
+        """Apply a publish plan and record the published data in the publish ledger.
+
+        With a `publish-parallelism` above 1, the relations are published to concurrently on
+        a bounded thread pool. A failure on a relation does not stop the others, the failures
+        are raised together afterwards. The error fails the hook: Juju then discards every
+        write of the dispatch, the ledger included, and the publish is retried as a whole.
+
+        Raises:
+            PublishError: if the publish failed on any relation.
+        """
+        ledger = self.state.publish_ledger
+        entries, failures = self._apply_steps(plan, ledger)
+
+        for step in plan.steps:
+            if step.relation_id in failures:
+                logger.error(
+                    f"Failed to publish to relation id {step.relation_id}: "
+                    f"{failures[step.relation_id]!r}"
+                )
+            elif step.mutations:
+                logger.info(
+                    f"Updated relation id {step.relation_id} to generation {step.generation}, "
+                    f"changed fields: {step.changed_fields}"
+                )
+
+        ledger.update(entries)
+        self.state.save_publish_ledger(ledger)
+
+        if failures:
+            raise PublishError(failures)
+
+    def _apply_steps(
+        self, plan: PublishPlan, ledger: dict[int, PublishLedgerEntry]
+    ) -> tuple[dict[int, PublishLedgerEntry], dict[int, Exception]]:
+        """Apply the steps of a plan, sequentially or on a bounded thread pool.
+
+        Relations receiving the same update are applied in bulk. The workers only issue the
+        hook tool calls writing to the relations of their batch: the data interface, with its
+        secret cache, is shared between them and guards its caches with a lock. The relations
+        are loaded beforehand, and the ledger entries are built on the calling thread.
+
+        Returns:
+            tuple: the ledger entries of the successful publishes and the errors of the
+                failed ones, by relation id.
+        """
+        provider_data = self.state.provider_data_interface
+        parallelism = min(self.state.publish_parallelism, len(plan.steps))
+        batches = self._batches(plan.steps, parallelism)
+
+        errors: dict[int, Exception | None] = {}
+        if parallelism <= 1:
+            for batch in batches:
+                errors |= self._apply_batch(batch)
+        else:
+            # load the lazily loaded relations and Juju version before sharing the model
+            _ = provider_data.relations, provider_data.secrets_enabled
+            with ThreadPoolExecutor(
+                max_workers=parallelism, thread_name_prefix="jwt-publish"
+            ) as executor:
+                for batch_errors in executor.map(self._apply_batch, batches):
+                    errors |= batch_errors
+
+        entries, failures = {}, {}
+        for step in plan.steps:
+            if error := errors.get(step.relation_id):
+                failures[step.relation_id] = error
+                continue
+
+            try:
+                entries[step.relation_id] = self._ledger_entry(
+                    step,
+                    ledger.get(step.relation_id),
+                    secret_revisions=sum(
+                        mutation.type == MutationType.SECRET_SET for mutation in step.mutations
+                    ),
+                )
+            except Exception as e:
+                failures[step.relation_id] = e
+        return entries, failures
+
+    @staticmethod
+    def _batches(steps: list[RelationPublish], parallelism: int) -> list[list[RelationPublish]]:
+        """Group the steps applying the same update, split for the workers to share the load."""
+        groups: dict[tuple, list[RelationPublish]] = {}
+        for step in steps:
+            key = (tuple(step.update.items()), tuple(step.removed_fields))
+            groups.setdefault(key, []).append(step)
+
+        batches = []
+        for group in groups.values():
+            batch_size = -(-len(group) // max(parallelism, 1))
+            batches += [group[i : i + batch_size] for i in range(0, len(group), batch_size)]
+        return batches
+
+    def reconcile(self) -> list[int]:
+        """Check a bounded slice of the relations for drift and republish the drifted ones.
+
+        Relations are checked round-robin, ordered by id, starting after the last relation
+        checked by the previous invocation. This keeps the cost per call constant regardless
+        of the number of relations.
+
+        Returns:
+            list[int]: the ids of the relations which were republished.
+        """
+        provider_data = self.state.provider_data_interface
+        if not (batch := self._next_reconcile_batch(provider_data.relations)):
+            return []
+
+        plan = PublishPlan()
+        ledger = self.state.publish_ledger
+        for relation in batch:
+            profile = self.state.relation_profile(relation)
+            if not (config := self.state.issuer_profiles.get(profile)):
+                logger.error(f"Profile {profile} invalid, cannot reconcile relation {relation.id}")
+                continue
+
+            payload = config.to_dict()
+            published = self._published(
+                relation.id, payload, ledger.get(relation.id), check_revision=True
+            )
+            if payload_digest(published) != payload_digest(payload):
+                logger.warning(f"Relation id {relation.id} drifted from the expected data")
+                plan.steps.append(
+                    self._plan_relation(relation.id, profile, payload, published=published)
+                )
+
+        self.execute(plan)
+        self.state.reconcile_cursor = batch[-1].id
+        return [step.relation_id for step in plan.steps]
+
+    def verify_publish_ledger(self) -> bool:
+        """Verify a sample of the publish ledger against the relations, e.g. on a new leader.
+
+        If the sampled entries match what is published, the ledger is trusted, which spares
+        the new leader from rewriting every relation. Otherwise, the ledger is discarded and
+        the next update compares the data of every relation.
 
-        for relation in self.state.provider_data_interface.relations:
-            self.state.provider_data_interface.update_relation_data(
-                relation.id, self.state.jwt_auth_config.to_dict()
+        Returns:
+            bool: whether the ledger was trusted.
+        """
+        provider_data = self.state.provider_data_interface
+        relation_ids = {relation.id for relation in provider_data.relations}
+        ledger = {
+            relation_id: entry
+            for relation_id, entry in self.state.publish_ledger.items()
+            if relation_id in relation_ids
+        }
+
+        sample = random.sample(sorted(ledger), min(RECONCILE_BATCH_SIZE, len(ledger)))
+        for relation_id in sample:
+            entry = ledger[relation_id]
+            if entry.public_digest and entry.secret_digests is not None:
+                # the secret fields are covered by the revision of the secret, it is not read
+                published = provider_data.fetch_my_public_relation_data(relation_id)
+                matches = payload_digest(published) == entry.public_digest
+            else:
+                published = provider_data.fetch_my_relation_data([relation_id]).get(
+                    relation_id, {}
+                )
+                matches = payload_digest(published) == entry.digest
+            if (
+                not matches
+                or provider_data.relation_secret_id(relation_id) != entry.secret_id
+                or provider_data.relation_secret_revision(relation_id) != entry.revision
+            ):
+                logger.warning(f"Publish ledger is stale for relation id {relation_id}")
+                self.state.save_publish_ledger({})
+                return False
+
+        logger.info(f"Publish ledger verified on {len(sample)} of {len(ledger)} relations")
+        self.state.save_publish_ledger(ledger)
+        return True
+
+    def remove_relation(self, relation_id: int) -> None:
+        """Remove the secret and any bookkeeping of a relation that is gone."""
+        if self.state.provider_data_interface.remove_relation_secret(relation_id):
+            logger.info(f"Removed secret of relation id {relation_id}")
+
+        ledger = self.state.publish_ledger
+        if ledger.pop(relation_id, None):
+            self.state.save_publish_ledger(ledger)
+
+    def remove_orphaned_secrets(
+        self, max_relation_id: int, min_relation_id: int = 0
+    ) -> tuple[list[int], int | None]:
+        """Remove relation secrets left behind by relations that no longer exist.
+
+        Earlier revisions of the charm did not clean up on relation-broken. Since relation
+        ids are assigned incrementally by Juju, the relation ids from `min_relation_id` up to
+        `max_relation_id` which do not belong to an active relation, of any endpoint, are
+        probed for a left-over secret, each probe costing a hook tool call. As relation ids are
+        shared by all the relations of the model, at most `ORPHANED_SECRETS_PROBE_LIMIT` ids
+        are probed per call.
+
+        Returns:
+            tuple: the ids of the relations whose secret was removed, and the relation id to
+                resume from, None once `max_relation_id` was reached.
+        """
+        provider_data = self.state.provider_data_interface
+        active_relation_ids = {
+            relation.id
+            for relations in self.state.model.relations.values()
+            for relation in relations
+        }
+
+        removed = []
+        probed = 0
+        next_relation_id = None
+        for relation_id in range(min_relation_id, max_relation_id + 1):
+            if relation_id in active_relation_ids:
+                continue
+
+            if probed == ORPHANED_SECRETS_PROBE_LIMIT:
+                next_relation_id = relation_id
+                break
+
+            probed += 1
+            if provider_data.remove_relation_secret(relation_id):
+                removed.append(relation_id)
+
+        logger.info(f"Removed orphaned secrets of relation ids {removed}")
+        return removed, next_relation_id
+
+    def _next_reconcile_batch(self, relations: list[Relation]) -> list[Relation]:
+        """Return the next relations to check for drift, continuing after the cursor."""
+        relations = sorted(relations, key=lambda relation: relation.id)
+        cursor = self.state.reconcile_cursor
+
+        start = next(
+            (index for index, relation in enumerate(relations) if relation.id > cursor), 0
+        )
+        return (relations[start:] + relations[:start])[:RECONCILE_BATCH_SIZE]
+
+    def _plan_relation(
+        self,
+        relation_id: int,
+        profile: str,
+        payload: dict[str, str],
+        published: dict[str, str] | None = None,
+        entry: PublishLedgerEntry | None = None,
+        assume_changed: frozenset[str] = frozenset(),
+    ) -> RelationPublish:
+        """Plan the publish of the payload to a relation, writing only the fields that changed.
+
+        Every publish that changes at least one field bumps the relation's generation and
+        announces the changed fields, so that requirers can pick the cheapest reload path.
+        The mutations mirror the hook tool calls issued by the data interface when applying
+        the update. When a secret field changed, the whole content of the secret is written.
+        """
+        provider_data = self.state.provider_data_interface
+        if published is None:
+            published = self._published(relation_id, payload, entry)
+
+        changed_fields = self._changed_fields(published, payload) | (
+            assume_changed & payload.keys()
+        )
+        generation = int(published.get(GENERATION_FIELD, 0))
+        digests = {
+            "digest": payload_digest(payload),
+            "public_digest": self._public_digest(payload),
+            "secret_digests": self._secret_digests(payload),
+        }
+        if not changed_fields:
+            return RelationPublish(
+                relation_id=relation_id, generation=generation, profile=profile, **digests
+            )
+
+        step = RelationPublish(
+            relation_id=relation_id,
+            generation=generation + 1,
+            profile=profile,
+            changed_fields=sorted(changed_fields),
+            **digests,
+        )
+
+        step.update = {field: payload[field] for field in step.changed_fields if field in payload}
+        if changed_fields & set(SECRET_FIELDS):
+            step.update |= {field: payload[field] for field in SECRET_FIELDS if field in payload}
+        step.update[GENERATION_FIELD] = str(step.generation)
+        step.update[CHANGED_FIELDS_FIELD] = json.dumps(step.changed_fields)
+        # the secret fields left out of the payload are dropped along with the secret content
+        step.removed_fields = sorted(
+            field for field in changed_fields - payload.keys() if field not in SECRET_FIELDS
+        )
+
+        if secret_keys := tuple(field for field in step.update if field in SECRET_FIELDS):
+            if provider_data.relation_secret_id(relation_id):
+                step.mutations.append(Mutation(MutationType.SECRET_SET, relation_id, secret_keys))
+            else:
+                step.mutations += [
+                    Mutation(MutationType.SECRET_ADD, relation_id, secret_keys),
+                    Mutation(MutationType.SECRET_GRANT, relation_id),
+                    Mutation(
+                        MutationType.RELATION_SET,
+                        relation_id,
+                        (provider_data.relation_secret_field,),
+                    ),
+                ]
+
+        step.mutations.append(
+            Mutation(
+                MutationType.RELATION_SET,
+                relation_id,
+                tuple(field for field in step.update if field not in SECRET_FIELDS),
+            )
+        )
+        step.mutations += [
+            Mutation(MutationType.RELATION_DELETE, relation_id, (field,))
+            for field in step.removed_fields
+        ]
+        return step
+
+    def _published(
+        self,
+        relation_id: int,
+        payload: dict[str, str],
+        entry: PublishLedgerEntry | None,
+        check_revision: bool = False,
+    ) -> dict[str, str]:
+        """Return the data published to a relation, reading its secret only if needed.
+
+        The secret is not read when the ledger entry records the digest of each secret field
+        published: the fields whose digest matches the payload are known to be published as
+        in the payload, the other ones are stood in by their digest, which differs from any
+        value. With `check_revision`, the revision of the secret must also match the entry,
+        e.g. to detect drift.
+        """
+        provider_data = self.state.provider_data_interface
+        if (
+            entry
+            and entry.secret_digests is not None
+            and entry.secret_id == provider_data.relation_secret_id(relation_id)
+            and (
+                not check_revision
+                or provider_data.relation_secret_revision(relation_id) == entry.revision
+            )
+        ):
+            digests = self._secret_digests(payload)
+            secret_fields = {
+                field: payload[field] if digests.get(field) == digest else digest
+                for field, digest in entry.secret_digests.items()
+            }
+            return provider_data.fetch_my_public_relation_data(relation_id) | secret_fields
+
+        return provider_data.fetch_my_relation_data([relation_id]).get(relation_id, {})
+
+    def _apply_batch(self, steps: list[RelationPublish]) -> dict[int, Exception | None]:
+        """Apply planned publishes sharing the same update to their relations.
+
+        Returns:
+            dict: by relation id, the error which prevented publishing, None on success.
+        """
+        provider_data = self.state.provider_data_interface
+        update, removed_fields = steps[0].update, steps[0].removed_fields
+
+        errors: dict[int, Exception | None] = {}
+        if steps[0].mutations:
+            errors = provider_data.bulk_update_relation_data(
+                [step.relation_id for step in steps], update
             )
-            logger.info(f"Updated relation id {relation.id}")
+
+        for step in steps:
+            if errors.get(step.relation_id):
+                continue
+
+            try:
+                if removed_fields:
+                    provider_data.delete_relation_data(step.relation_id, removed_fields)
+            except Exception as e:
+                errors[step.relation_id] = e
+            else:
+                errors[step.relation_id] = None
+        return errors
+
+    def _ledger_entry(
+        self,
+        step: RelationPublish,
+        entry: PublishLedgerEntry | None,
+        secret_revisions: int,
+    ) -> PublishLedgerEntry:
+        """Build the ledger entry of a relation after publishing the payload.
+
+        The revision of the relation secret is derived from the previous entry when possible,
+        as every update of the secret creates exactly one new revision.
+        """
+        provider_data = self.state.provider_data_interface
+        secret_id = provider_data.relation_secret_id(step.relation_id)
+
+        if entry and entry.secret_id == secret_id and entry.revision is not None:
+            revision = entry.revision + secret_revisions
+        else:
+            revision = provider_data.relation_secret_revision(step.relation_id)
+
+        return PublishLedgerEntry(
+            digest=step.digest,
+            secret_id=secret_id,
+            revision=revision,
+            public_digest=step.public_digest,
+            secret_digests=step.secret_digests,
+        )
+
+    @staticmethod
+    def _public_digest(payload: dict[str, str]) -> str:
+        """Return the digest of the fields of the payload published in the data bag."""
+        return payload_digest(
+            {field: value for field, value in payload.items() if field not in SECRET_FIELDS}
+        )
+
+    @staticmethod
+    def _secret_digests(payload: dict[str, str]) -> dict[str, str]:
+        """Return the digest of each field of the payload published in the secret."""
+        return {
+            field: payload_digest({field: payload[field]})
+            for field in SECRET_FIELDS
+            if field in payload
+        }
+
+    @staticmethod
+    def _changed_fields(published: dict[str, str], payload: dict[str, str]) -> set[str]:
+        """Return the payload fields which differ between the published data and payload."""
+        fields = set(payload_fields(published)) | set(payload_fields(payload))
+        return {field for field in fields if published.get(field) != payload.get(field)}
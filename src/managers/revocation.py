@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Manager for handling the revocation of tokens."""
+
+import logging
+import time
+from typing import Iterable
+
+from charms.jwt_integrator.v0.jwt_configuration import (
+    REVOCATION_BUCKET_SECONDS,
+    BloomFilter,
+    revocation_bucket,
+)
+
+from core.models import RevocationBucket
+from core.state import State
+from literals import REVOCATION_OVERFLOW_LIMIT
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationManager:
+    """Handle the revoked tokens published to the requirers.
+
+    Revoked tokens are grouped in buckets by expiry. A bucket is dropped once all its tokens
+    expired, including the clock skew tolerance, so that the published revocations stay
+    bounded by the tokens which are still valid.
+    """
+
+    def __init__(self, state: State):
+        self.state = state
+
+    def revoke(self, token_ids: Iterable[str], expiry: int) -> list[str]:
+        """Revoke tokens by their `jti` claim, given the expiry of the tokens.
+
+        Newly revoked tokens are published in full until they exceed the overflow limit of
+        their bucket, which rebuilds its Bloom filter. This keeps the filter, the largest part
+        of the bucket, unchanged on most revocations.
+
+        Returns:
+            list[str]: the ids of the tokens which were neither revoked already nor expired.
+        """
+        buckets = self.state.revocation_buckets
+        changed = self._expired(buckets)
+        if expiry + self.state.clock_skew_tolerance <= time.time():
+            logger.info(f"Tokens expired at {expiry}, nothing to revoke")
+            self._save(buckets, changed)
+            return []
+
+        known = {token_id for bucket in buckets.values() for token_id in bucket.tokens}
+        revoked = [token_id for token_id in dict.fromkeys(token_ids) if token_id not in known]
+        if revoked:
+            start = revocation_bucket(expiry)
+            bucket = buckets.setdefault(start, RevocationBucket())
+            bucket.tokens.update(dict.fromkeys(revoked, expiry))
+            if len(bucket.overflow) > REVOCATION_OVERFLOW_LIMIT:
+                self._rebuild_filter(bucket)
+            changed.add(start)
+            logger.info(f"Revoked {len(revoked)} tokens expiring at {expiry}")
+
+        self._save(buckets, changed)
+        return revoked
+
+    def unrevoke(self, token_ids: Iterable[str]) -> list[str]:
+        """Lift the revocation of tokens, rebuilding the filters which held any of them.
+
+        Returns:
+            list[str]: the ids of the tokens which were revoked.
+        """
+        buckets = self.state.revocation_buckets
+        token_ids = set(token_ids)
+
+        unrevoked, changed = [], set()
+        for start, bucket in buckets.items():
+            if not (removed := token_ids.intersection(bucket.tokens)):
+                continue
+
+            filtered = list(bucket.tokens)[: bucket.filtered]
+            bucket.tokens = {
+                token_id: expiry
+                for token_id, expiry in bucket.tokens.items()
+                if token_id not in removed
+            }
+            if removed.intersection(filtered):
+                self._rebuild_filter(bucket)
+            unrevoked += sorted(removed)
+            changed.add(start)
+
+        if changed:
+            self._save(buckets, changed)
+            logger.info(f"Lifted the revocation of {len(unrevoked)} tokens")
+        return unrevoked
+
+    def expire(self) -> list[int]:
+        """Drop the buckets whose tokens all expired.
+
+        Returns:
+            list[int]: the start of the dropped buckets.
+        """
+        buckets = self.state.revocation_buckets
+        if expired := self._expired(buckets):
+            self._save(buckets, expired)
+            logger.info(f"Dropped the expired revocation buckets {sorted(expired)}")
+        return sorted(expired)
+
+    @property
+    def revoked_count(self) -> int:
+        """The number of revoked tokens."""
+        return sum(len(bucket.tokens) for bucket in self.state.revocation_buckets.values())
+
+    def _expired(self, buckets: dict[int, RevocationBucket]) -> set[int]:
+        """Remove the buckets whose tokens all expired, returning their start."""
+        horizon = time.time() - self.state.clock_skew_tolerance - REVOCATION_BUCKET_SECONDS
+        expired = {start for start in buckets if start <= horizon}
+        for start in expired:
+            del buckets[start]
+        return expired
+
+    def _save(self, buckets: dict[int, RevocationBucket], changed: set[int]) -> None:
+        """Persist the changed buckets only."""
+        if changed:
+            self.state.save_revocation_buckets({start: buckets.get(start) for start in changed})
+
+    @staticmethod
+    def _rebuild_filter(bucket: RevocationBucket) -> None:
+        """Move all the revoked tokens of a bucket to a Bloom filter sized for them."""
+        bucket.filtered = len(bucket.tokens)
+        bucket.filter = BloomFilter.build(bucket.tokens).to_dict() if bucket.tokens else None
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Manager for handling the signing key generated by the charm."""
+
+import base64
+import hashlib
+import json
+import logging
+import secrets
+from typing import Any
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from core.state import State
+
+logger = logging.getLogger(__name__)
+
+ALGORITHMS = ("HS256", "RS256", "ES256", "EdDSA")
+
+# Members of each key type hashed into the RFC 7638 thumbprint of a JWK
+THUMBPRINT_MEMBERS = {
+    "oct": ("k", "kty"),
+    "RSA": ("e", "kty", "n"),
+    "EC": ("crv", "kty", "x", "y"),
+    "OKP": ("crv", "kty", "x"),
+}
+
+
+class SigningKeyError(Exception):
+    """The signing key could not be generated."""
+
+
+def _b64url(data: bytes) -> str:
+    """Encode bytes in unpadded base64url, as used in JWKs."""
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _b64url_int(value: int) -> str:
+    """Encode an unsigned integer in unpadded base64url, as used in JWKs."""
+    return _b64url(value.to_bytes(max((value.bit_length() + 7) // 8, 1), "big"))
+
+
+def thumbprint(jwk: dict[str, str]) -> str:
+    """Return the RFC 7638 thumbprint of a JWK, used as key id."""
+    members = {member: jwk[member] for member in THUMBPRINT_MEMBERS[jwk["kty"]]}
+    canonical = json.dumps(members, sort_keys=True, separators=(",", ":"))
+    return _b64url(hashlib.sha256(canonical.encode()).digest())
+
+
+def generate_key(algorithm: str) -> tuple[str, str, dict[str, str]]:
+    """Generate a key for the given JWS algorithm.
+
+    Returns:
+        tuple: the verification key, the signing key and the JWK of the verification key.
+            For HS256, the verification and signing keys are the same base64-encoded secret.
+
+    Raises:
+        SigningKeyError: if the algorithm is not supported.
+    """
+    if algorithm == "HS256":
+        key = secrets.token_bytes(32)
+        encoded = base64.b64encode(key).decode()
+        return encoded, encoded, {"kty": "oct", "k": _b64url(key)}
+
+    if algorithm not in ALGORITHMS:
+        raise SigningKeyError(f"Unsupported algorithm {algorithm}, expected one of {ALGORITHMS}")
+
+    private_key: Any
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        numbers = private_key.public_key().public_numbers()
+        jwk = {"kty": "RSA", "n": _b64url_int(numbers.n), "e": _b64url_int(numbers.e)}
+    elif algorithm == "ES256":
+        private_key = ec.generate_private_key(ec.SECP256R1())
+        numbers = private_key.public_key().public_numbers()
+        jwk = {
+            "kty": "EC",
+            "crv": "P-256",
+            "x": _b64url(numbers.x.to_bytes(32, "big")),
+            "y": _b64url(numbers.y.to_bytes(32, "big")),
+        }
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+        raw = private_key.public_key().public_bytes(
+            serialization.Encoding.Raw, serialization.PublicFormat.Raw
+        )
+        jwk = {"kty": "OKP", "crv": "Ed25519", "x": _b64url(raw)}
+
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    return public_pem.decode(), private_pem.decode(), jwk
+
+
+class SigningKeyManager:
+    """Generate and rotate the signing key of the default profile."""
+
+    def __init__(self, state: State):
+        self.state = state
+
+    def rotate(self, algorithm: str) -> dict[str, str]:
+        """Generate a new signing key, stored as a single new revision of the charm's secret.
+
+        The key id and, for asymmetric algorithms, the JWK set of the public keys are computed
+        once here and stored along with the key, so that publishing does not parse the key
+        material. The previous key of the same algorithm stays published after the new one,
+        in the comma-separated list of keys and in the JWK set, until the next rotation:
+        tokens signed before the rotation still verify meanwhile.
+
+        Returns:
+            dict: the content of the secret.
+
+        Raises:
+            SigningKeyError: if the `signing-key` option is set, or the key cannot be generated.
+        """
+        if self.state.charm_config.get("signing-key"):
+            raise SigningKeyError("Unset the signing-key option to use a generated signing key")
+
+        verification_key, signing_key, jwk = generate_key(algorithm)
+        key_id = thumbprint(jwk)
+
+        verification_keys = [verification_key]
+        previous = self.state.managed_signing_key or {}
+        if previous.get("algorithm") == algorithm and (
+            previous_keys := previous.get("signing-key")
+        ):
+            verification_keys.append(previous_keys.split(",")[0].strip())
+
+        content = {
+            "signing-key": ",".join(verification_keys),
+            "private-key": signing_key,
+            "algorithm": algorithm,
+            "key-id": key_id,
+        }
+
+        # symmetric keys are never published in a JWK set
+        if algorithm != "HS256":
+            keys = [jwk | {"kid": key_id, "alg": algorithm, "use": "sig"}]
+            if previous.get("algorithm") == algorithm and (jwks := previous.get("jwks")):
+                keys.append(json.loads(jwks)["keys"][0])
+            content["jwks"] = json.dumps({"keys": keys})
+
+        self.state.save_managed_signing_key(content)
+        logger.info(f"Rotated the signing key to {algorithm} key {key_id}")
+        return content
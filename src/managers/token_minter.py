@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Manager for minting test tokens matching the published configuration."""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import logging
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import IO, Any, Callable, Iterator, Optional
+
+from charms.jwt_integrator.v0.jwt_configuration import parse_claim_path
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, padding
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+
+from core.key_material import decode_base64
+from core.models import JWTAuthConfiguration
+from core.state import State
+
+logger = logging.getLogger(__name__)
+
+
+class TokenMintingError(Exception):
+    """Test tokens cannot be minted with the configuration of the profile."""
+
+
+class TokenKind:
+    """The kinds of minted tokens, i.e. the outcome expected from a verifier."""
+
+    VALID = "valid"
+    EXPIRED = "expired"
+    NOT_YET_VALID = "not-yet-valid"
+    WRONG_AUDIENCE = "wrong-audience"
+
+
+@dataclass
+class TokenDistribution:
+    """The distribution of the claims of the minted tokens."""
+
+    count: int
+    expired_fraction: float = 0.0
+    not_yet_valid_fraction: float = 0.0
+    wrong_audience_fraction: float = 0.0
+    roles: tuple[str, ...] = ("reader",)
+    subjects: int = 1000
+    lifetime: int = 3600
+    seed: Optional[int] = None
+
+    def validate(self) -> None:
+        """Check the distribution is consistent.
+
+        Raises:
+            TokenMintingError: if the count or fractions are out of bounds.
+        """
+        fractions = [self.expired_fraction, self.not_yet_valid_fraction]
+        fractions.append(self.wrong_audience_fraction)
+        if self.count < 0 or any(not 0 <= fraction <= 1 for fraction in fractions):
+            raise TokenMintingError("The count must be positive and the fractions within [0, 1]")
+        if sum(fractions) > 1:
+            raise TokenMintingError("The fractions of invalid tokens add up to more than 1")
+        if not self.roles or self.subjects < 1 or self.lifetime < 1:
+            raise TokenMintingError("Roles, subjects and lifetime must not be empty")
+
+
+def _b64url(data: bytes) -> str:
+    """Encode bytes in unpadded base64url, as used in JWTs."""
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _set_claim(claims: dict[str, Any], path: str, value: Any) -> None:
+    """Set a claim at a claim path, creating the nested claims on the way."""
+    *parents, name = parse_claim_path(path)
+    for parent in parents:
+        claims = claims.setdefault(parent, {})
+    claims[name] = value
+
+
+def signer(key_content: dict[str, str]) -> tuple[str, Callable[[bytes], bytes]]:
+    """Return the JWS algorithm and signing function of the signing key of a profile.
+
+    HMAC keys are the base64-encoded (standard or url-safe, padded or not) `signing-key`, the
+    first one of a comma-separated list of keys. Asymmetric keys are signed with the
+    `private-key` field of the secret, as stored by the rotate-signing-key action.
+
+    Raises:
+        TokenMintingError: if the key cannot sign tokens.
+    """
+    algorithm = key_content.get("algorithm") or "HS256"
+    if algorithm == "HS256":
+        try:
+            key = decode_base64(key_content["signing-key"].split(",")[0].strip())
+        except (ValueError, binascii.Error):
+            raise TokenMintingError("The HMAC signing key is not base64-encoded")
+        return algorithm, lambda data: hmac.new(key, data, hashlib.sha256).digest()
+
+    if not (private_pem := key_content.get("private-key")):
+        raise TokenMintingError(f"Signing {algorithm} tokens requires the private key")
+
+    private_key: Any = serialization.load_pem_private_key(private_pem.encode(), password=None)
+    if algorithm == "RS256":
+        return algorithm, lambda data: private_key.sign(data, padding.PKCS1v15(), hashes.SHA256())
+
+    if algorithm == "ES256":
+
+        def sign(data: bytes) -> bytes:
+            r, s = decode_dss_signature(private_key.sign(data, ec.ECDSA(hashes.SHA256())))
+            return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+        return algorithm, sign
+
+    return algorithm, private_key.sign
+
+
+class TokenMinter:
+    """Mint signed test tokens matching the configuration published to the requirers."""
+
+    def __init__(self, state: State):
+        self.state = state
+
+    def mint(self, profile: str, distribution: TokenDistribution, output: IO[str]) -> Counter:
+        """Write `<kind> <token>` lines to the output, one per token, without holding them.
+
+        Returns:
+            Counter: the number of tokens minted of each kind.
+
+        Raises:
+            TokenMintingError: if the profile is invalid or its key cannot sign tokens.
+        """
+        distribution.validate()
+        config = self.state.issuer_profiles.get(profile)
+        key_content = self.state.signing_key_content(profile)
+        if not config or not key_content:
+            raise TokenMintingError(f"Profile {profile} is invalid")
+
+        if distribution.wrong_audience_fraction and not config.required_audience:
+            raise TokenMintingError(f"Profile {profile} does not require an audience")
+
+        algorithm, sign = signer(key_content)
+        header = {"alg": algorithm, "typ": "JWT"}
+        if config.key_id:
+            header["kid"] = config.key_id
+        encoded_header = _b64url(json.dumps(header, separators=(",", ":")).encode())
+
+        kinds: Counter = Counter()
+        for kind, claims in self._claims(config, distribution):
+            signing_input = (
+                f"{encoded_header}.{_b64url(json.dumps(claims, separators=(',', ':')).encode())}"
+            )
+            output.write(f"{kind} {signing_input}.{_b64url(sign(signing_input.encode()))}\n")
+            kinds[kind] += 1
+
+        logger.info(f"Minted {distribution.count} test tokens of profile {profile}: {dict(kinds)}")
+        return kinds
+
+    @staticmethod
+    def _claims(
+        config: JWTAuthConfiguration, distribution: TokenDistribution
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Generate the kind and claims of each token."""
+        rng = random.Random(distribution.seed)
+        now = int(time.time())
+        # beyond the clock skew tolerated by verifiers, for invalid tokens to be rejected
+        margin = (config.jwt_clock_skew_tolerance or 0) + 60
+        thresholds = [
+            (distribution.expired_fraction, TokenKind.EXPIRED),
+            (distribution.not_yet_valid_fraction, TokenKind.NOT_YET_VALID),
+            (distribution.wrong_audience_fraction, TokenKind.WRONG_AUDIENCE),
+        ]
+
+        for _ in range(distribution.count):
+            draw, kind = rng.random(), TokenKind.VALID
+            for fraction, invalid_kind in thresholds:
+                if draw < fraction:
+                    kind = invalid_kind
+                    break
+                draw -= fraction
+
+            issued_at = now
+            if kind == TokenKind.EXPIRED:
+                issued_at = now - distribution.lifetime - margin - rng.randrange(3600)
+            elif kind == TokenKind.NOT_YET_VALID:
+                issued_at = now + margin + rng.randrange(3600)
+
+            claims: dict[str, Any] = {
+                "jti": f"{rng.getrandbits(128):032x}",
+                "iat": issued_at,
+                "nbf": issued_at,
+                "exp": issued_at + distribution.lifetime,
+            }
+            if config.required_issuer:
+                claims["iss"] = config.required_issuer
+            if config.required_audience:
+                claims["aud"] = config.required_audience
+            if kind == TokenKind.WRONG_AUDIENCE:
+                claims["aud"] = f"not-{config.required_audience}"
+
+            _set_claim(
+                claims, config.subject_key or "sub", f"user-{rng.randrange(distribution.subjects)}"
+            )
+            roles = rng.sample(distribution.roles, rng.randint(1, len(distribution.roles)))
+            _set_claim(claims, config.roles_key, roles)
+            yield kind, claims
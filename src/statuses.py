@@ -10,6 +10,8 @@ from enum import Enum
 
 from data_platform_helpers.advanced_statuses.models import StatusObject
 
+from literals import DEFAULT_PROFILE
+
 
 class CharmStatuses(Enum):
     """Collection of possible statuses for the charm."""
@@ -19,4 +21,14 @@ class CharmStatuses(Enum):
         status="blocked",
         message="Missing 'signing-key' or 'roles-key' configuration - check logs for more details",
     )
+    ISSUER_PROFILES_INVALID = StatusObject(
+        status="blocked",
+        message="Invalid issuer profiles or bindings - check logs for more details",
+    )
     NO_PROVIDER_RELATION = StatusObject(status="blocked", message="no relation for jwt interface")
+
+
+def option_invalid(profile: str, option: str, error: str) -> StatusObject:
+    """Status of an option of a profile whose value is invalid."""
+    owner = "" if profile == DEFAULT_PROFILE else f" of profile {profile}"
+    return StatusObject(status="blocked", message=f"Invalid `{option}`{owner}: {error}")
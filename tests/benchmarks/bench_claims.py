@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Microbenchmark of the extraction of the roles and subject claims of a token.
+
+Compares the accessors compiled by the jwt_configuration library to a generic walk of the
+claims along the path, resolved on every call as a requirer would without the library.
+
+Usage: tox -e benchmark
+"""
+
+import timeit
+from typing import Any, Mapping
+
+from charms.jwt_integrator.v0.jwt_configuration import claim_accessor, parse_claim_path
+
+CALLS = 100_000
+
+CLAIMS = {
+    "iss": "https://idp.example.com",
+    "sub": "user",
+    "roles": ["admin", "reader"],
+    "realm_access": {"roles": ["admin", "reader"]},
+    "resource_access": {
+        "my-client": {"roles": ["writer"]},
+        **{f"client-{i}": {"roles": ["reader"]} for i in range(20)},
+    },
+}
+
+PATHS = ["roles", "/realm_access/roles", "/resource_access/my-client/roles", "/missing/roles"]
+
+
+def _walk(claims: Mapping[str, Any], path: str) -> Any:
+    """Return the claim at a path, parsing the path and walking the claims generically."""
+    value: Any = claims
+    for segment in parse_claim_path(path):
+        if not isinstance(value, Mapping):
+            return None
+        value = value.get(segment)
+    return value
+
+
+def main() -> None:
+    """Print the time per call of each extraction method for each path."""
+    print(f"{'path':<36} {'walk (ns)':>10} {'compiled (ns)':>14}")
+    for path in PATHS:
+        accessor = claim_accessor(path)
+        assert accessor(CLAIMS) == _walk(CLAIMS, path)
+
+        walk = min(timeit.repeat(lambda: _walk(CLAIMS, path), number=CALLS, repeat=5))
+        compiled = min(timeit.repeat(lambda: accessor(CLAIMS), number=CALLS, repeat=5))
+        print(f"{path:<36} {walk / CALLS * 1e9:>10.0f} {compiled / CALLS * 1e9:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Microbenchmark of the fetch path of the data_interfaces library at high relation counts.
+
+Runs the JWT integrator's provider data interface inside a dispatch of the charm, with every
+relation already published to, and reports the time of the most common read patterns. The
+hook tool calls are excluded, only the overhead of the library is measured.
+
+Usage: tox -e benchmark [-- <relation count> ...]
+"""
+
+import sys
+import time
+from collections.abc import Callable
+
+from ops import testing
+
+from charm import JwtIntegratorCharm
+from core.models import JwtProviderData
+from literals import JWT_CONFIG_RELATION, STATUS_PEERS_RELATION
+
+APP_NAME = "jwt-integrator"
+RELATION_COUNTS = [100, 500, 1000]
+ROUNDS = 5
+
+
+def _state(relation_count: int) -> testing.State:
+    """Build a state with `relation_count` relations holding published data."""
+    relations = []
+    secrets = []
+    for relation_id in range(2, relation_count + 2):
+        secret = testing.Secret(
+            tracked_content={"signing-key": "123"},
+            owner="app",
+            label=f"{JWT_CONFIG_RELATION}.{relation_id}.extra.secret",
+        )
+        secrets.append(secret)
+        relations.append(
+            testing.Relation(
+                id=relation_id,
+                interface="jwt",
+                endpoint=JWT_CONFIG_RELATION,
+                remote_app_name=f"requirer-{relation_id}",
+                local_app_data={
+                    "schema-version": "1",
+                    "roles-key": "roles",
+                    "jwt-header": "Authorization",
+                    "generation": "1",
+                    "changed-fields": '["signing-key"]',
+                    "secret-extra": secret.id,
+                },
+            )
+        )
+
+    return testing.State(
+        leader=True,
+        relations={testing.PeerRelation(id=1, endpoint=STATUS_PEERS_RELATION), *relations},
+        secrets=secrets,
+    )
+
+
+def _measure(relation_count: int, scenario: Callable[[JwtProviderData], object]) -> float:
+    """Return the best time in seconds of running `scenario` once the model is loaded."""
+    ctx = testing.Context(JwtIntegratorCharm)
+
+    best = float("inf")
+    with ctx(ctx.on.update_status(), _state(relation_count)) as manager:
+        provider_data = JwtProviderData(manager.charm.model, JWT_CONFIG_RELATION)
+        # the first run loads the data bags and secrets through the (mocked) hook tools
+        scenario(provider_data)
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            scenario(provider_data)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+SCENARIOS = {
+    "fetch_my_relation_data(all ids, databag fields)": lambda data: data.fetch_my_relation_data(
+        [relation.id for relation in data.relations], ["roles-key", "generation"]
+    ),
+    "fetch_my_relation_data(each id)": lambda data: [
+        data.fetch_my_relation_data([relation.id], ["roles-key"]) for relation in data.relations
+    ],
+    "fetch_my_relation_data(all ids, all fields)": lambda data: data.fetch_my_relation_data(
+        [relation.id for relation in data.relations]
+    ),
+}
+
+
+def main(relation_counts: list[int]) -> None:
+    """Print the timings of each scenario for each relation count."""
+    print(f"{'scenario':<50} {'relations':>9} {'seconds':>9}")
+    for name, scenario in SCENARIOS.items():
+        for relation_count in relation_counts:
+            print(f"{name:<50} {relation_count:>9} {_measure(relation_count, scenario):>9.4f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or RELATION_COUNTS)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Replay of an event journal recorded by the charm, against the current code.
+
+Feeds the events of a journal (see the `event-journal` option) through `ops.testing`, each
+event running on the state left by the previous one, with the leadership, options and relations
+recorded along with the event. Reports the time and the hook tool calls of each event, and their
+totals, so that a fix can be checked against the trace of an incident.
+
+Secret contents are not journaled: every secret referenced by the options is replayed with a
+generated HMAC key, rotated on each of its secret-changed events. Events on secrets the charm
+owns cannot be replayed and are skipped. The hook tool calls are counted with the recorder of
+the unit tests (tests/unit/helpers.py).
+
+Usage: tox -e replay -- <journal> [--quiet]
+"""
+
+import base64
+import json
+import secrets
+import sys
+import time
+from collections import Counter
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import yaml
+from helpers import counting_hook_tools
+from ops import testing
+
+from charm import JwtIntegratorCharm
+from literals import STATUS_PEERS_RELATION
+
+APP_NAME = "jwt-integrator"
+
+
+@dataclass
+class ReplayedEvent:
+    """The outcome of the replay of a journal entry."""
+
+    event: str
+    seconds: float = 0.0
+    hook_tools: Counter = field(default_factory=Counter)
+    skipped: Optional[str] = None
+
+
+def _signing_key() -> dict[str, str]:
+    """Generate the content of a secret holding an HMAC signing key."""
+    return {"signing-key": base64.b64encode(secrets.token_bytes(32)).decode()}
+
+
+def _secret_ids(config: dict[str, Any]) -> set[str]:
+    """Return the ids of the secrets referenced by the options."""
+    ids = {config["signing-key"]} if config.get("signing-key") else set()
+    try:
+        profiles = yaml.safe_load(config.get("issuer-profiles") or "{}")
+    except yaml.YAMLError:
+        return ids
+
+    if isinstance(profiles, dict):
+        ids.update(
+            str(options["signing-key"])
+            for options in profiles.values()
+            if isinstance(options, dict) and options.get("signing-key")
+        )
+    return ids
+
+
+class Replay:
+    """Replay journal entries one after the other, carrying the state between them."""
+
+    def __init__(self):
+        self.ctx = testing.Context(JwtIntegratorCharm)
+        self.state = testing.State()
+        self.secrets: dict[str, testing.Secret] = {}
+
+    def run(self, entry: dict[str, Any]) -> ReplayedEvent:
+        """Replay a journal entry."""
+        config = {key: value for key, value in entry["config"].items() if key != "event-journal"}
+        for secret_id in _secret_ids(config):
+            if secret_id not in self.secrets:
+                self.secrets[secret_id] = testing.Secret(
+                    id=secret_id, tracked_content=_signing_key(), remote_grants=APP_NAME
+                )
+
+        replayed = ReplayedEvent(entry["event"])
+        if (secret := entry.get("secret")) and secret["id"] not in self.secrets:
+            replayed.skipped = f"secret {secret['id']} is not referenced by the options"
+            return replayed
+
+        if secret and entry["event"] == "secret_changed":
+            content = _signing_key()
+            self.secrets[secret["id"]] = testing.Secret(
+                id=secret["id"],
+                tracked_content=self.secrets[secret["id"]].tracked_content,
+                latest_content=content,
+                remote_grants=APP_NAME,
+            )
+
+        state = self._state(entry, config)
+        if not (event := self._event(entry, state)):
+            replayed.skipped = "unsupported event"
+            return replayed
+
+        with counting_hook_tools(replayed.hook_tools):
+            start = time.perf_counter()
+            try:
+                self.state = self.ctx.run(event, state)
+            except testing.ActionFailed as e:
+                self.state = e.state
+            replayed.seconds = time.perf_counter() - start
+
+        # the charm tracks the latest revision of the secrets it read
+        self.secrets.update(
+            {secret.id: secret for secret in self.state.secrets if secret.id in self.secrets}
+        )
+        return replayed
+
+    def _state(self, entry: dict[str, Any], config: dict[str, Any]) -> testing.State:
+        """Build the state of an entry, keeping the data of the relations which still exist."""
+        previous = {relation.id: relation for relation in self.state.relations}
+        recorded = {endpoint: dict(ids) for endpoint, ids in entry["relations"].items()}
+        if relation := entry.get("relation"):
+            # broken relations are left out of the model while handling relation-broken
+            recorded.setdefault(relation["endpoint"], {})[str(relation["id"])] = relation["app"]
+
+        relations = []
+        for endpoint, ids in recorded.items():
+            for relation_id, app in ids.items():
+                if int(relation_id) in previous:
+                    relations.append(previous[int(relation_id)])
+                elif endpoint == STATUS_PEERS_RELATION:
+                    relations.append(testing.PeerRelation(id=int(relation_id), endpoint=endpoint))
+                else:
+                    relations.append(
+                        testing.Relation(
+                            id=int(relation_id),
+                            endpoint=endpoint,
+                            interface="jwt",
+                            remote_app_name=app or "requirer",
+                        )
+                    )
+
+        owned = [secret for secret in self.state.secrets if secret.id not in self.secrets]
+        return testing.State(
+            leader=entry["leader"],
+            config=config,
+            relations=relations,
+            secrets=[*owned, *self.secrets.values()],
+            stored_states=self.state.stored_states,
+            deferred=self.state.deferred,
+        )
+
+    def _event(self, entry: dict[str, Any], state: testing.State) -> Optional[Any]:
+        """Return the event of an entry, None if it cannot be replayed."""
+        name = entry["event"]
+        if relation := entry.get("relation"):
+            return getattr(self.ctx.on, name)(state.get_relation(relation["id"]))
+        if name == "action":
+            return self.ctx.on.action(entry["action"]["name"], params=entry["action"]["params"])
+        if secret := entry.get("secret"):
+            if name != "secret_changed":
+                return None
+            return self.ctx.on.secret_changed(self.secrets[secret["id"]])
+        if not hasattr(self.ctx.on, name):
+            return None
+        return getattr(self.ctx.on, name)()
+
+
+def replay(lines: Iterator[str]) -> list[ReplayedEvent]:
+    """Replay the entries of a journal."""
+    replayer = Replay()
+    return [replayer.run(json.loads(line)) for line in lines if line.strip()]
+
+
+def main(path: str, quiet: bool = False) -> None:
+    """Replay a journal and print the time and hook tool calls of its events."""
+    with open(path) as journal:
+        replayed = replay(journal)
+
+    totals: Counter = Counter()
+    for index, event in enumerate(replayed):
+        totals += event.hook_tools
+        if quiet:
+            continue
+        if event.skipped:
+            print(f"{index:>6} {event.event:<28} skipped: {event.skipped}")
+            continue
+        top = ", ".join(f"{tool}={count}" for tool, count in event.hook_tools.most_common(4))
+        print(
+            f"{index:>6} {event.event:<28} {event.seconds * 1000:>9.2f} ms "
+            f"{sum(event.hook_tools.values()):>6} calls  {top}"
+        )
+
+    seconds = sum(event.seconds for event in replayed)
+    skipped = sum(1 for event in replayed if event.skipped)
+    print(f"\n{len(replayed)} events ({skipped} skipped) replayed in {seconds:.3f}s")
+    for tool, count in totals.most_common():
+        print(f"  {tool:<24} {count:>8}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], quiet="--quiet" in sys.argv[2:])
@@ -2,9 +2,15 @@
 # Copyright 2025 Canonical Ltd.
 # See LICENSE file for licensing details.
 
+import inspect
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
 from data_platform_helpers.advanced_statuses.models import StatusObject
 from data_platform_helpers.advanced_statuses.utils import as_status
 from ops import testing
+from scenario.mocking import _MockModelBackend
 
 
 def status_is(state_out: testing.State, to_status: StatusObject, is_app: bool = False) -> bool:
@@ -17,3 +23,78 @@ def status_is(state_out: testing.State, to_status: StatusObject, is_app: bool =
         or juju_status.message.startswith(f"{status.message:.40}")
         or (to_status.short_message is not None and to_status.short_message in status.message)
     )
+
+
+# hook tool name by model backend method
+MUTATING_HOOK_TOOLS = {
+    "relation_set": "relation-set",
+    "secret_add": "secret-add",
+    "secret_grant": "secret-grant",
+    "secret_set": "secret-set",
+}
+
+# every hook tool, by model backend method
+ALL_HOOK_TOOLS = {
+    method: method.replace("_", "-")
+    for method, attribute in vars(_MockModelBackend).items()
+    if not method.startswith("_") and callable(attribute)
+}
+
+# every hook tool but juju-log and is-leader, whose result ops caches for the duration of the
+# leadership lease, by model backend method
+HOOK_TOOLS = {
+    method: tool
+    for method, tool in ALL_HOOK_TOOLS.items()
+    if method not in ("juju_log", "is_leader")
+}
+
+
+def hook_tool_recorders(
+    tools: dict[str, str], record: Callable[[str, int | None], None]
+) -> dict[str, Callable]:
+    """Wrap the model backend methods of the given hook tools, recording each call.
+
+    Returns:
+        dict: by model backend method, the wrapper calling `record` with the hook tool and the
+            relation id of the call (None if the hook tool takes none).
+    """
+
+    def recording(method: str, tool: str):
+        original = getattr(_MockModelBackend, method)
+        signature = inspect.signature(original)
+
+        def wrapper(self, *args, **kwargs):
+            arguments = signature.bind(self, *args, **kwargs).arguments
+            record(tool, arguments.get("relation_id"))
+            return original(self, *args, **kwargs)
+
+        return wrapper
+
+    return {method: recording(method, tool) for method, tool in tools.items()}
+
+
+def record_hook_tools(
+    monkeypatch, tools: dict[str, str] = MUTATING_HOOK_TOOLS
+) -> list[tuple[str, int | None]]:
+    """Record the calls of the given hook tools, as (hook tool, relation id) pairs."""
+    calls = []
+    wrappers = hook_tool_recorders(
+        tools, lambda tool, relation_id: calls.append((tool, relation_id))
+    )
+    for method, wrapper in wrappers.items():
+        monkeypatch.setattr(_MockModelBackend, method, wrapper)
+    return calls
+
+
+@contextmanager
+def counting_hook_tools(counts: Counter, tools: dict[str, str] = ALL_HOOK_TOOLS) -> Iterator[None]:
+    """Count the calls of the given hook tools within the context, by hook tool."""
+    originals = {method: getattr(_MockModelBackend, method) for method in tools}
+    wrappers = hook_tool_recorders(tools, lambda tool, _: counts.update((tool,)))
+    for method, wrapper in wrappers.items():
+        setattr(_MockModelBackend, method, wrapper)
+    try:
+        yield
+    finally:
+        for method, original in originals.items():
+            setattr(_MockModelBackend, method, original)
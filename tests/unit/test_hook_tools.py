@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Golden transcripts and budgets of the hook tool calls of canonical scenarios.
+
+The ordered hook tool calls of each scenario are compared to the transcript recorded in
+`golden/hook_tools.json`, and their number per tool to a budget growing with the number of
+relations. After an intended change of the calls, within budget, update the transcripts with:
+
+    UPDATE_GOLDEN=1 tox -e unit -- -k test_golden_transcript
+"""
+
+import dataclasses
+import json
+import os
+import random
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from helpers import HOOK_TOOLS, record_hook_tools
+from ops import testing
+
+from src.charm import JwtIntegratorCharm
+from src.literals import JWT_CONFIG_RELATION, RECONCILE_BATCH_SIZE, STATUS_PEERS_RELATION
+
+APP_NAME = "jwt-integrator"
+GOLDEN_PATH = Path(__file__).parent / "golden" / "hook_tools.json"
+# the last count exceeds the relations checked by a single reconcile or ledger verification
+RELATION_COUNTS = [1, 5, 20, 2 * RECONCILE_BATCH_SIZE + 5]
+
+# ops runs these once for every relation of an endpoint when loading the relations, in any hook
+# using them, they are left out of the total
+RELATION_LOADING_TOOLS = {"relation-list", "relation-remote-app-name"}
+
+SIGNING_KEY = "a2V5LW9mLXRoaXJ0eS10d28tYnl0ZXMtZm9yLWhzMjU2"
+ROTATED_SIGNING_KEY = "cm90YXRlZC1rZXktb2YtdGhpcnR5LXR3by1ieXRlcw"
+
+# Budget of each scenario as (calls, calls per relation) per hook tool, and in total. Every
+# secret is read at most once per dispatch.
+BUDGETS: dict[str, dict[str, tuple[int, int]]] = {
+    "deploy": {
+        "relation-set": (1, 2),
+        "secret-get": (4, 2),
+        "secret-add": (0, 1),
+        "relation-list": (4, 4),
+        "relation-remote-app-name": (0, 5),
+        "total": (36, 9),
+    },
+    # only the new relation is published to
+    "add-relation": {
+        "relation-set": (3, 0),
+        "secret-get": (4, 0),
+        "secret-add": (1, 0),
+        "relation-list": (4, 2),
+        "relation-remote-app-name": (3, 2),
+        "total": (24, 0),
+    },
+    # a single read, secret revision and databag update per relation
+    "rotate-key": {
+        "relation-set": (1, 1),
+        "secret-get": (1, 1),
+        "secret-set": (0, 1),
+        "relation-list": (1, 1),
+        "relation-remote-app-name": (0, 1),
+        "total": (8, 5),
+    },
+    # the relation secrets are neither read nor written
+    "change-config": {
+        "relation-set": (1, 1),
+        "secret-get": (1, 0),
+        "secret-set": (0, 0),
+        "relation-list": (1, 1),
+        "relation-remote-app-name": (0, 1),
+        "total": (8, 2),
+    },
+    # a slice of the relations is checked for drift, and unchanged statuses are not rewritten
+    "update-status": {
+        "relation-set": (0, 0),
+        "secret-get": (1 + RECONCILE_BATCH_SIZE, 0),
+        "secret-info-get": (RECONCILE_BATCH_SIZE, 0),
+        "relation-get": (2 + RECONCILE_BATCH_SIZE, 0),
+        "relation-list": (1, 1),
+        "relation-remote-app-name": (0, 1),
+        "total": (8 + 3 * RECONCILE_BATCH_SIZE, 0),
+    },
+    # the new leader trusts the publish ledger after checking a sample of the relations
+    "leader-switch": {
+        "relation-set": (0, 0),
+        "secret-get": (1 + RECONCILE_BATCH_SIZE, 0),
+        "secret-info-get": (RECONCILE_BATCH_SIZE, 0),
+        "relation-get": (1 + RECONCILE_BATCH_SIZE, 0),
+        "relation-list": (1, 1),
+        "relation-remote-app-name": (0, 1),
+        "total": (7 + 3 * RECONCILE_BATCH_SIZE, 0),
+    },
+}
+
+
+def _state(relation_count: int) -> testing.State:
+    """Return a configured leader unit with `relation_count` requirers, not published to yet."""
+    secret = testing.Secret(tracked_content={"signing-key": SIGNING_KEY}, remote_grants=APP_NAME)
+    relations = [
+        testing.Relation(
+            id=relation_id,
+            interface="jwt",
+            endpoint=JWT_CONFIG_RELATION,
+            remote_app_name=f"requirer-{relation_id}",
+        )
+        for relation_id in range(2, relation_count + 2)
+    ]
+    return testing.State(
+        leader=True,
+        config={"signing-key": secret.id, "roles-key": "roles", "jwt-header": "Authorization"},
+        secrets=[secret],
+        relations={testing.PeerRelation(id=1, endpoint=STATUS_PEERS_RELATION), *relations},
+    )
+
+
+def _deployed(ctx: testing.Context, relation_count: int) -> testing.State:
+    """Return a leader unit which published the configuration to every relation."""
+    return ctx.run(ctx.on.config_changed(), _state(relation_count))
+
+
+Step = Callable[[testing.State], tuple[testing.State, object]]
+
+
+def _deploy(ctx: testing.Context, relation_count: int) -> tuple[testing.State, list[Step]]:
+    steps: list[Step] = [
+        lambda state: (state, ctx.on.install()),
+        lambda state: (state, ctx.on.leader_elected()),
+        lambda state: (state, ctx.on.config_changed()),
+        lambda state: (state, ctx.on.start()),
+    ]
+    return _state(relation_count), steps
+
+
+def _add_relation(ctx: testing.Context, relation_count: int) -> tuple[testing.State, list[Step]]:
+    state = _deployed(ctx, relation_count)
+    relation = testing.Relation(
+        id=relation_count + 2, interface="jwt", endpoint=JWT_CONFIG_RELATION
+    )
+    state = dataclasses.replace(state, relations={*state.relations, relation})
+    steps: list[Step] = [
+        lambda state: (state, ctx.on.relation_created(state.get_relation(relation.id))),
+        lambda state: (state, ctx.on.relation_changed(state.get_relation(relation.id))),
+    ]
+    return state, steps
+
+
+def _rotate_key(ctx: testing.Context, relation_count: int) -> tuple[testing.State, list[Step]]:
+    state = _deployed(ctx, relation_count)
+
+    def rotate(state: testing.State) -> tuple[testing.State, object]:
+        [secret] = [secret for secret in state.secrets if secret.id == state.config["signing-key"]]
+        rotated = dataclasses.replace(secret, latest_content={"signing-key": ROTATED_SIGNING_KEY})
+        state = dataclasses.replace(
+            state, secrets={*(s for s in state.secrets if s.id != secret.id), rotated}
+        )
+        return state, ctx.on.secret_changed(rotated)
+
+    return state, [rotate]
+
+
+def _change_config(ctx: testing.Context, relation_count: int) -> tuple[testing.State, list[Step]]:
+    state = _deployed(ctx, relation_count)
+    state = dataclasses.replace(state, config=state.config | {"jwt-header": "X-Token"})
+    return state, [lambda state: (state, ctx.on.config_changed())]
+
+
+def _update_status(ctx: testing.Context, relation_count: int) -> tuple[testing.State, list[Step]]:
+    state = ctx.run(ctx.on.update_status(), _deployed(ctx, relation_count))
+    return state, [lambda state: (state, ctx.on.update_status())]
+
+
+def _leader_switch(ctx: testing.Context, relation_count: int) -> tuple[testing.State, list[Step]]:
+    # another unit takes over, sharing the application data but not the stored state
+    state = dataclasses.replace(_deployed(ctx, relation_count), stored_states=frozenset())
+    return state, [lambda state: (state, ctx.on.leader_elected())]
+
+
+SCENARIOS = {
+    "deploy": _deploy,
+    "add-relation": _add_relation,
+    "rotate-key": _rotate_key,
+    "change-config": _change_config,
+    "update-status": _update_status,
+    "leader-switch": _leader_switch,
+}
+
+
+def transcript(scenario: str, relation_count: int) -> list[str]:
+    """Return the ordered hook tool calls of a scenario, juju-log and is-leader excepted."""
+    random.seed(0)
+    ctx = testing.Context(JwtIntegratorCharm)
+    state, steps = SCENARIOS[scenario](ctx, relation_count)
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        calls = record_hook_tools(monkeypatch, HOOK_TOOLS)
+        for step in steps:
+            state, event = step(state)
+            state = ctx.run(event, state)
+    return [tool for tool, _ in calls]
+
+
+def _encode(tools: list[str]) -> list[str]:
+    """Run-length encode a transcript, repeated calls being noted `<tool> x<count>`."""
+    runs: list[list] = []
+    for tool in tools:
+        if runs and runs[-1][0] == tool:
+            runs[-1][1] += 1
+        else:
+            runs.append([tool, 1])
+    return [tool if count == 1 else f"{tool} x{count}" for tool, count in runs]
+
+
+@pytest.mark.parametrize("relation_count", RELATION_COUNTS)
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_hook_tool_budget(scenario, relation_count):
+    counts = Counter(transcript(scenario, relation_count))
+    counts["total"] = sum(
+        count for tool, count in counts.items() if tool not in RELATION_LOADING_TOOLS
+    )
+
+    over_budget = {
+        tool: (counts[tool], calls + per_relation * relation_count)
+        for tool, (calls, per_relation) in BUDGETS[scenario].items()
+        if counts[tool] > calls + per_relation * relation_count
+    }
+    assert not over_budget, f"Hook tool calls over budget (calls, budget): {over_budget}"
+
+
+def test_golden_transcript():
+    transcripts = {
+        f"{scenario}/{relation_count}": _encode(transcript(scenario, relation_count))
+        for scenario in SCENARIOS
+        for relation_count in RELATION_COUNTS
+    }
+    if os.environ.get("UPDATE_GOLDEN"):
+        GOLDEN_PATH.parent.mkdir(exist_ok=True)
+        GOLDEN_PATH.write_text(json.dumps(transcripts, indent=1) + "\n")
+
+    golden = json.loads(GOLDEN_PATH.read_text())
+    for name, recorded in transcripts.items():
+        assert recorded == golden[name], f"Hook tool calls of {name} changed"
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import base64
+import json
+
+import pytest
+from charms.jwt_integrator.v0.jwt_configuration import (
+    HOT_RELOADABLE_FIELDS,
+    REQUIRED_FIELDS,
+    SECRET_FIELDS,
+    BloomFilter,
+    CacheHints,
+    InvalidClaimPathError,
+    InvalidRoleMappingError,
+    IssuerKeySet,
+    JwtConfiguration,
+    PublishedChange,
+    ReloadPath,
+    RoleMapping,
+    UnsupportedSchemaVersionError,
+    claim_accessor,
+    compile_role_mapping,
+    normalize_claim_path,
+    payload_digest,
+    reload_path,
+    unverified_issuer,
+    validate_options,
+)
+
+
+def _token(claims: dict) -> str:
+    """Return an (unsigned) JWT carrying the given claims."""
+    segments = [{"alg": "HS256", "typ": "JWT"}, claims]
+    return (
+        ".".join(
+            base64.urlsafe_b64encode(json.dumps(segment).encode()).decode().rstrip("=")
+            for segment in segments
+        )
+        + ".c2lnbmF0dXJl"
+    )
+
+
+@pytest.mark.parametrize(
+    "changed_fields,expected",
+    [
+        ([], ReloadPath.NONE),
+        (["signing-key"], ReloadPath.HOT_RELOAD),
+        (["signing-key", "jwt-header"], ReloadPath.RESTART),
+        (["roles-key"], ReloadPath.RESTART),
+        (["schema-version"], ReloadPath.NONE),
+        (["schema-version", "signing-key"], ReloadPath.HOT_RELOAD),
+    ],
+)
+def test_reload_path(changed_fields, expected):
+    assert reload_path(changed_fields) == expected
+    assert PublishedChange(1, frozenset(changed_fields)).reload_path == expected
+
+
+def test_wire_format():
+    configuration = JwtConfiguration(
+        signing_key="123",
+        roles_key="roles",
+        jwt_header="Authorization",
+        jwt_clock_skew_tolerance=0,
+    )
+
+    payload = configuration.to_dict()
+    assert list(payload) == [
+        "schema-version",
+        "signing-key",
+        "roles-key",
+        "jwt-header",
+        "jwt-clock-skew-tolerance",
+    ]
+    assert payload["schema-version"] == "1"
+    assert payload["jwt-clock-skew-tolerance"] == "0"
+    assert JwtConfiguration.from_dict(payload) == configuration
+
+    # legacy payloads without schema version
+    legacy_payload = {"signing-key": "123", "roles-key": "roles"}
+    assert JwtConfiguration.from_dict(legacy_payload) == JwtConfiguration("123", "roles")
+
+    with pytest.raises(UnsupportedSchemaVersionError):
+        JwtConfiguration.from_dict(payload | {"schema-version": "2"})
+
+
+def test_schema():
+    assert SECRET_FIELDS == ["signing-key", "issuers"]
+    assert REQUIRED_FIELDS == ("signing-key", "roles-key")
+    assert {"signing-key", "key-cache-ttl"} <= HOT_RELOADABLE_FIELDS
+    assert "roles-key" not in HOT_RELOADABLE_FIELDS
+
+
+def test_validate_options():
+    values, errors = validate_options(
+        {
+            "roles-key": "realm_access.roles",
+            "jwt-header": "",
+            "jwt-clock-skew-tolerance": 30,
+            "key-cache-ttl": 600,
+            # options derived by the provider are not validated
+            "signing-key": 123,
+        }
+    )
+    assert errors == {}
+    # claim paths are kept as configured, along with their normalized form
+    assert values["roles_key"] == "realm_access.roles"
+    assert values["roles_path"] == "/realm_access/roles"
+    assert values["subject_path"] is None
+    assert values["jwt_header"] is None
+    assert values["jwt_clock_skew_tolerance"] == 30
+    assert values["key_cache_ttl"] == 600
+    assert values["subject_key"] is None
+    assert "signing_key" not in values
+
+    _, errors = validate_options(
+        {
+            "roles-key": "a..b",
+            "required-issuer": 1,
+            "jwt-clock-skew-tolerance": -1,
+            "key-cache-ttl": True,
+            "negative-cache-ttl": 100_000,
+        }
+    )
+    assert errors == {
+        "roles-key": "Empty claim name in claim path 'a..b'",
+        "required-issuer": "must be a string",
+        "jwt-clock-skew-tolerance": "must be at least 0",
+        "key-cache-ttl": "must be an integer",
+        "negative-cache-ttl": "must be between 0 and 86400",
+    }
+
+
+def test_payload_digest():
+    payload = JwtConfiguration(signing_key="123", roles_key="roles").to_dict()
+    reordered_payload = dict(reversed(payload.items()))
+
+    assert payload_digest(payload) == payload_digest(reordered_payload)
+    assert payload_digest(payload) == payload_digest(payload | {"generation": "3"})
+    assert payload_digest(payload) != payload_digest(payload | {"signing-key": "456"})
+
+
+def test_cache_hints():
+    configuration = JwtConfiguration(signing_key="123", roles_key="roles")
+    assert configuration.cache_hints == CacheHints()
+
+    configuration = JwtConfiguration(
+        signing_key="123", roles_key="roles", key_cache_ttl=600, verified_token_cache_size=0
+    )
+    payload = configuration.to_dict()
+    assert payload["key-cache-ttl"] == "600"
+    assert payload["verified-token-cache-size"] == "0"
+    assert "negative-cache-ttl" not in payload
+    assert JwtConfiguration.from_dict(payload).cache_hints == CacheHints(
+        key_ttl=600, verified_token_cache_size=0
+    )
+    assert reload_path(["key-cache-ttl", "negative-cache-ttl"]) == ReloadPath.HOT_RELOAD
+
+
+def test_issuer_key_sets():
+    issuers = {
+        "https://idp-a.example.com": {"signing-key": "abc"},
+        "https://idp-b.example.com": {"signing-key": "def"},
+    }
+    audiences = {"https://idp-a.example.com": "app"}
+    configuration = JwtConfiguration(
+        signing_key="abc", roles_key="roles", issuers=issuers, issuer_audiences=audiences
+    )
+
+    payload = configuration.to_dict()
+    assert json.loads(payload["issuers"]) == issuers
+    assert json.loads(payload["issuer-audiences"]) == audiences
+    assert JwtConfiguration.from_dict(payload) == configuration
+    # keys are rotated with a hot reload, audiences are changed with a restart
+    assert reload_path(["issuers"]) == ReloadPath.HOT_RELOAD
+    assert reload_path(["issuer-audiences"]) == ReloadPath.RESTART
+
+    assert configuration.select_key_set(_token({"iss": "https://idp-b.example.com"})) == (
+        IssuerKeySet("https://idp-b.example.com", "def")
+    )
+    assert configuration.select_key_set(_token({"iss": "https://idp-a.example.com"})) == (
+        IssuerKeySet("https://idp-a.example.com", "abc", "app")
+    )
+    assert configuration.select_key_set(_token({"iss": "https://idp-c.example.com"})) is None
+    assert configuration.select_key_set(_token({"sub": "user"})) is None
+
+    # providers before `issuer-audiences` publish the audience in the issuer entry
+    legacy = JwtConfiguration(
+        signing_key="abc",
+        roles_key="roles",
+        issuers={"https://idp-a.example.com": {"signing-key": "abc", "required-audience": "app"}},
+    )
+    assert legacy.select_key_set(_token({"iss": "https://idp-a.example.com"})) == (
+        IssuerKeySet("https://idp-a.example.com", "abc", "app")
+    )
+
+    # without issuer entries, the configuration trusts its required issuer, if any
+    configuration = JwtConfiguration(signing_key="123", roles_key="roles")
+    assert configuration.select_key_set(_token({})) == IssuerKeySet(None, "123")
+    configuration.required_issuer = "https://idp.example.com"
+    assert configuration.select_key_set(_token({"iss": "https://idp.example.com"}))
+    assert configuration.select_key_set(_token({"iss": "https://idp-a.example.com"})) is None
+
+
+@pytest.mark.parametrize("token", ["", "a.b", "a.b.c.d", "a.!!!.c", "a.bnVsbA.c", "a.WzFd.c"])
+def test_unverified_issuer_malformed(token):
+    assert unverified_issuer(token) is None
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [
+        ("roles", "roles"),
+        ("/roles", "roles"),
+        ("realm_access.roles", "/realm_access/roles"),
+        ("/resource_access/my-client/roles", "/resource_access/my-client/roles"),
+        ("https://example.com/roles", "https://example.com/roles"),
+        ("/https:~1~1example.com~1roles", "https://example.com/roles"),
+        ("/cognito:groups.all", "/cognito:groups.all"),
+        ("/a~0b/c", "/a~0b/c"),
+    ],
+)
+def test_normalize_claim_path(path, expected):
+    assert normalize_claim_path(path) == expected
+    assert normalize_claim_path(expected) == expected
+
+
+@pytest.mark.parametrize("path", ["", "/", "realm_access..roles", "/a//b", "/a~2b"])
+def test_invalid_claim_path(path):
+    with pytest.raises(InvalidClaimPathError):
+        normalize_claim_path(path)
+
+
+def test_claim_accessors():
+    claims = {
+        "sub": "user",
+        "roles": ["admin"],
+        "realm_access": {"roles": ["reader"]},
+        "resource_access": {"my-client": {"roles": ["writer"]}, "other": "x"},
+        "https://example.com/roles": ["ops"],
+    }
+
+    assert claim_accessor("roles")(claims) == ["admin"]
+    assert claim_accessor("/realm_access/roles")(claims) == ["reader"]
+    assert claim_accessor("/resource_access/my-client/roles")(claims) == ["writer"]
+    assert claim_accessor("https://example.com/roles")(claims) == ["ops"]
+    assert claim_accessor("/resource_access/other/roles")(claims) is None
+    assert claim_accessor("/sub/name")(claims) is None
+    assert claim_accessor("/missing/roles")(claims) is None
+
+    configuration = JwtConfiguration(signing_key="123", roles_key="/realm_access/roles")
+    assert configuration.roles(claims) == ["reader"]
+    assert configuration.subject(claims) == "user"
+
+    # the normalized path is read over the path as configured
+    configuration = JwtConfiguration(
+        signing_key="123",
+        roles_key="resource_access.my-client.roles",
+        roles_path="/resource_access/my-client/roles",
+    )
+    payload = configuration.to_dict()
+    assert payload["roles-key"] == "resource_access.my-client.roles"
+    assert JwtConfiguration.from_dict(payload).roles(claims) == ["writer"]
+
+
+def test_role_mapping():
+    table = compile_role_mapping(
+        {
+            "admin": "all_access",
+            "team-*": ["readall", "kibana_user", "readall"],
+            "team-ops-*": "ops",
+            "*": ["own_index"],
+        }
+    )
+    assert table == {
+        "exact": {"admin": ["all_access"]},
+        "prefix": {"team-": ["kibana_user", "readall"], "team-ops-": ["ops"]},
+        "default": ["own_index"],
+    }
+
+    role_mapping = RoleMapping(table)
+    assert role_mapping.resolve_role("admin") == {"all_access"}
+    assert role_mapping.resolve_role("team-ops-eu") == {"ops"}
+    assert role_mapping.resolve_role("team-dev") == {"kibana_user", "readall"}
+    assert role_mapping.resolve_role("administrator") == {"own_index"}
+    assert role_mapping.resolve(["admin", "team-dev"]) == {"all_access", "kibana_user", "readall"}
+    assert role_mapping.resolve("admin") == {"all_access"}
+    assert role_mapping.resolve(None) == frozenset()
+
+    configuration = JwtConfiguration(
+        signing_key="123", roles_key="/realm_access/roles", role_mapping=table
+    )
+    assert JwtConfiguration.from_dict(configuration.to_dict()) == configuration
+    claims = {"realm_access": {"roles": ["team-ops-eu", "guest"]}}
+    assert configuration.backend_roles(claims) == {"ops", "own_index"}
+    assert JwtConfiguration(signing_key="123", roles_key="roles").backend_roles(claims) is None
+
+
+@pytest.mark.parametrize(
+    "rules",
+    [{"": "all_access"}, {"team-*-dev": "dev"}, {"**": "all"}, {"a": [1]}, {"a": {"b": "c"}}],
+)
+def test_invalid_role_mapping(rules):
+    with pytest.raises(InvalidRoleMappingError):
+        compile_role_mapping(rules)
+
+
+def test_bloom_filter():
+    members = [f"token-{i}" for i in range(10_000)]
+    bloom_filter = BloomFilter.build(members, false_positive_rate=1e-3)
+    assert all(member in bloom_filter for member in members)
+    false_positives = sum(f"valid-{i}" in bloom_filter for i in range(10_000))
+    assert false_positives < 50
+
+    decoded = BloomFilter.from_dict(json.loads(json.dumps(bloom_filter.to_dict())))
+    assert decoded.bits == bloom_filter.bits
+    assert "token-42" in decoded
+
+    # the step between the bit positions of a member is odd, so they never collapse
+    assert all(BloomFilter._digest(member)[1] % 2 for member in members)
+    small_filter = BloomFilter(size=64, hashes=8)
+    for member in members[:100]:
+        small_filter.bits = bytearray(8)
+        small_filter.add(member)
+        assert sum(bin(byte).count("1") for byte in small_filter.bits) == 8
+
+
+def test_is_revoked():
+    configuration = JwtConfiguration(
+        signing_key="123",
+        roles_key="roles",
+        revocations={
+            3600: {"filter": BloomFilter.build(["a", "b"]).to_dict(), "tokens": ["c"]},
+            7200: {"tokens": ["d"]},
+        },
+    )
+    payload = configuration.to_dict()
+    assert list(payload)[-2:] == ["revoked-3600", "revoked-7200"]
+    assert JwtConfiguration.from_dict(payload) == configuration
+    assert payload_digest(payload) != payload_digest(payload | {"revoked-7200": "{}"})
+
+    assert all(configuration.is_revoked(jti) for jti in ["a", "b", "c", "d"])
+    assert configuration.is_revoked("a", expiry=3700)
+    assert not configuration.is_revoked("a", expiry=7300)
+    assert not configuration.is_revoked("a", expiry=100)
+    assert not configuration.is_revoked("e")
+    assert not configuration.is_revoked(None)
+    assert not JwtConfiguration(signing_key="123", roles_key="roles").is_revoked("a")
+
+    assert reload_path(["revoked-3600", "signing-key"]) == ReloadPath.HOT_RELOAD
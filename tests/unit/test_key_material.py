@@ -0,0 +1,62 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import json
+
+import pytest
+
+from core.key_material import InvalidSigningKeyError, parse_signing_key
+
+PUBLIC_PEM = """-----BEGIN PUBLIC KEY-----
+MFkwEwYHKoZIzj0CAQYIKoZIzj0DAQcDQgAEc7aYcBs4wGO11BHSLIi9ED3b2E7a
+IGjxawPO7wFJfg7Dasa3MKUqGBn5IZkG99hB1rjm5+LBaDGDuPnvjAyPYQ==
+-----END PUBLIC KEY-----"""
+PRIVATE_PEM = PUBLIC_PEM.replace("PUBLIC", "PRIVATE")
+EC_JWK = {
+    "kty": "EC",
+    "crv": "P-256",
+    "x": "c7aYcBs4wGO11BHSLIi9ED3b2E7aIGjxawPO7wFJfg4",
+    "y": "w2rGtzClKhgZ-SGZBvfYQda45ufiwWgxg7j574wMj2E",
+}
+
+
+@pytest.mark.parametrize(
+    "value,kinds",
+    [
+        ("a2V5LW9mLXRoaXJ0eS10d28tYnl0ZXMtZm9yLWhzMjU2", ["hmac"]),
+        ("a2V5LW9m, LXRoaXJ0eS10d28_Ynl0ZXM-", ["hmac", "hmac"]),
+        (PUBLIC_PEM, ["pem"]),
+        (f"{PUBLIC_PEM},\n{PUBLIC_PEM}", ["pem", "pem"]),
+        (f"{PUBLIC_PEM}\n{PUBLIC_PEM}", ["pem", "pem"]),
+        (json.dumps(EC_JWK), ["jwk"]),
+        (json.dumps({"keys": [EC_JWK, {"kty": "oct", "k": "a2V5"}]}), ["jwk", "jwk"]),
+    ],
+)
+def test_parse_signing_key(value, kinds):
+    assert parse_signing_key(value) == kinds
+
+
+@pytest.mark.parametrize(
+    "value,error",
+    [
+        (" ", "signing-key is empty"),
+        ("not a key", "HMAC key is not valid base64"),
+        ("a2V5,", "key 2 of 2: empty entry"),
+        (f"a2V5,{PUBLIC_PEM}", "mixes HMAC keys and PEM public keys"),
+        (PRIVATE_PEM, "PEM key is a PRIVATE KEY"),
+        (PUBLIC_PEM[:-10], "no matching BEGIN and END"),
+        (f"{PUBLIC_PEM} trailing", "text outside of its BEGIN and END"),
+        (PUBLIC_PEM.replace("MFkw", "M$kw"), "PEM PUBLIC KEY is not valid base64"),
+        (PUBLIC_PEM.replace("MFkw", "AFkw"), "does not hold a DER structure"),
+        ("{not json", "JWK is not valid JSON"),
+        (json.dumps({"keys": []}), "non-empty list of keys"),
+        (json.dumps({"kty": "DSA"}), "unknown key type DSA"),
+        (json.dumps({"kty": "RSA", "n": "AQAB"}), "RSA JWK misses members ['e']"),
+        (json.dumps(EC_JWK | {"d": "AQAB"}), "EC JWK is a private key"),
+    ],
+)
+def test_parse_invalid_signing_key(value, error):
+    with pytest.raises(
+        InvalidSigningKeyError, match=error.replace("[", r"\[").replace("$", r"\$")
+    ):
+        parse_signing_key(value)